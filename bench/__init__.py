@@ -0,0 +1,220 @@
+"""
+Benchmark suite for solving, generating, loading and rendering levels.
+
+Each suite yields (name, timings) pairs, where timings summarise repeated
+calls of one operation. Results are saved as JSON together with a
+description of the machine, and can be compared against a saved baseline
+to flag regressions. Run it with `python -m bench`; see __main__.py.
+"""
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+import level_format
+from level_generator import generate_level
+from solve import bfs_solve, verify_level
+
+LEVELS_PATH = Path("levels")
+GENERATE_SIZES = (3, 5, 10, 20, 30)
+QUICK_GENERATE_SIZES = (3, 10, 20)
+GENERATE_WALL_PERCENTAGES = (0.2, 0.4, 0.6)
+RENDER_FRAMES = 200
+
+Timings = Dict[str, float]
+
+
+def measure(fn: Callable[[], object], min_time: float = 0.2, min_runs: int = 3,
+            max_runs: int = 1000) -> Timings:
+    """
+    Call `fn` repeatedly, for at least `min_runs` calls and `min_time`
+    seconds (capped at `max_runs`), and summarise the per-call times.
+    """
+    times = []
+    total = 0.0
+    while len(times) < max_runs and (len(times) < min_runs or total < min_time):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        total += elapsed
+    times.sort()
+    return {
+        "median": statistics.median(times),
+        "min": times[0],
+        "p95": times[min(len(times) - 1, int(len(times) * 0.95))],
+        "runs": len(times)
+    }
+
+
+def machine_info() -> Dict:
+    """Where the results came from: platform, interpreter, libraries and commit."""
+    info = {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__
+    }
+    try:
+        import pygame
+        info["pygame"] = pygame.version.ver
+    except ImportError:
+        pass
+    try:
+        info["commit"] = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                        text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return info
+
+
+def level_files() -> List[Path]:
+    return sorted(level_format.list_level_files(LEVELS_PATH), key=level_format.natural_sort_key)
+
+
+def bench_solve(quick: bool = False, min_time: float = 0.2) -> Iterator[Tuple[str, Timings]]:
+    """bfs_solve and verify_level on every level in levels/."""
+    for level_file in level_files():
+        level_data = level_format.load_level(level_file)
+        grid = level_data['grid']
+        yield (f"solve.bfs_solve[{level_file.stem}]",
+               measure(lambda: bfs_solve(level_data['start'], level_data['goal'], grid), min_time))
+        yield (f"solve.verify_level[{level_file.stem}]",
+               measure(lambda: verify_level(level_data, use_cache=False), min_time))
+
+
+def bench_generate(quick: bool = False, min_time: float = 0.2) -> Iterator[Tuple[str, Timings]]:
+    """generate_level across level sizes and wall percentages, with a fixed seed."""
+    for size in QUICK_GENERATE_SIZES if quick else GENERATE_SIZES:
+        for wall_percentage in GENERATE_WALL_PERCENTAGES:
+            yield (f"generate[size={size},walls={wall_percentage}]",
+                   measure(lambda: generate_level(wall_percentage, size, np.random.default_rng(0)), min_time))
+
+
+def bench_load(quick: bool = False, min_time: float = 0.2) -> Iterator[Tuple[str, Timings]]:
+    """load_level for each level as JSON, binary and compressed binary."""
+    with tempfile.TemporaryDirectory() as tmp:
+        for level_file in level_files():
+            level_data = level_format.load_level(level_file)
+            copies = {
+                "json": level_format.save_json_level(level_data, Path(tmp) / f"{level_file.stem}.json"),
+                "binary": level_format.save_binary_level(level_data, Path(tmp) / f"{level_file.stem}.tbs"),
+                "binary_zlib": level_format.save_binary_level(level_data, Path(tmp) / f"{level_file.stem}.z.tbs",
+                                                              compress=True)
+            }
+            for name, copy in copies.items():
+                yield (f"load.{name}[{level_file.stem}]",
+                       measure(lambda: level_format.load_level(copy), min_time))
+
+
+def bench_render(quick: bool = False, min_time: float = 0.2) -> Iterator[Tuple[str, Timings]]:
+    """draw_maze and draw_menu per frame, on SDL's dummy video driver."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import main
+    from game_state import GameState
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the menu's leaderboard queries away from the real database
+        main.LEADERBOARD_DB = str(Path(tmp) / "leaderboard.db")
+        main.load_leaderboard.board = None
+        main.best_scores.cache = None
+
+        level_file = max(level_files(), key=lambda f: f.stat().st_size)
+        state = GameState.from_level_data(level_format.load_level(level_file))
+
+        # A random walk to replay, so frames alternate between moves within a
+        # slice, slice changes and plane switches like real play
+        rng = random.Random(0)
+        frames = []
+        while len(frames) < RENDER_FRAMES:
+            if rng.random() < 0.2:
+                changed = state.switch_plane(rng.choice(list(main.PLANES)))
+            else:
+                changed = state.move(*rng.choice(list(main.MOVE_KEYS.values())))
+            if changed:
+                frames.append((state.pos, state.plane, state.steps))
+            if state.won:
+                state.reset()
+        frame_iter = iter(())
+
+        def draw_frame(show_overview=False):
+            nonlocal frame_iter
+            frame = next(frame_iter, None)
+            if frame is None:
+                frame_iter = iter(frames)
+                frame = next(frame_iter)
+            pos, plane, steps = frame
+            main.draw_maze(pos, state.grid, state.goal, state.size, plane, steps, False,
+                           show_overview=show_overview)
+
+        def draw_full():
+            main.invalidate_maze()
+            main.draw_maze(state.pos, state.grid, state.goal, state.size, state.plane, state.steps, False)
+
+        draw_full()  # Warm the slice cache
+        name = level_file.stem
+        yield f"render.draw_maze.full[{name}]", measure(draw_full, min_time)
+        yield f"render.draw_maze.play[{name}]", measure(draw_frame, min_time, min_runs=len(frames))
+        main.invalidate_maze()
+        yield (f"render.draw_maze.play_overview[{name}]",
+               measure(lambda: draw_frame(True), min_time, min_runs=len(frames)))
+        main.draw_menu()  # Build the level index outside the timing
+        yield "render.draw_menu", measure(main.draw_menu, min_time)
+        main.load_leaderboard.board.close()
+        main.load_leaderboard.board = None
+
+
+SUITES = {
+    "solve": bench_solve,
+    "generate": bench_generate,
+    "load": bench_load,
+    "render": bench_render
+}
+
+
+def run(suites: List[str], quick: bool = False, min_time: float = 0.2,
+        report: Callable[[str, Timings], None] = None) -> Dict:
+    """Run the named suites and return the results document."""
+    results = {}
+    for suite in suites:
+        for name, timings in SUITES[suite](quick, min_time):
+            results[name] = timings
+            if report:
+                report(name, timings)
+    return {
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": machine_info(),
+        "results": results
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """
+    Compare median times with a baseline. Each benchmark present in both
+    gets a row with its relative change; `regression` is set when it got
+    slower by more than `threshold` (0.1 = 10%).
+    """
+    rows = []
+    for name, timings in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        change = timings["median"] / base["median"] - 1 if base["median"] > 0 else 0.0
+        rows.append({
+            "name": name,
+            "median": timings["median"],
+            "baseline": base["median"],
+            "change": change,
+            "regression": change > threshold
+        })
+    return rows
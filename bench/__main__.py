@@ -0,0 +1,62 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from bench import SUITES, compare, run
+
+
+def print_timing(name, timings):
+    print(f"{name:<45} {timings['median'] * 1000:>10.3f} ms  (min {timings['min'] * 1000:.3f} ms, "
+          f"{timings['runs']} runs)")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m bench', description='Benchmark solve, generate, load and render')
+    parser.add_argument('suites', nargs='*', metavar='suite',
+                        help=f"Suites to run: {', '.join(SUITES)} (default: all)")
+    parser.add_argument('--quick', action='store_true', help='Fewer generator sizes')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='Least time (s) spent timing each benchmark (default: 0.2)')
+    parser.add_argument('--output', type=Path, default=Path('bench_results.json'),
+                        help='Where to save the results (default: bench_results.json)')
+    parser.add_argument('--baseline', type=Path, default=Path('bench_baseline.json'),
+                        help='Baseline to compare against, if it exists (default: bench_baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='Also save these results as the baseline')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Slowdown that counts as a regression, as a fraction (default: 0.1)')
+    args = parser.parse_args()
+    unknown = [suite for suite in args.suites if suite not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)} (choose from {', '.join(SUITES)})")
+
+    results = run(args.suites or list(SUITES), args.quick, args.min_time, print_timing)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"Results saved to {args.output}")
+
+    regressions = []
+    if args.baseline.exists() and not args.save_baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} ({baseline.get('created', 'unknown date')}, "
+              f"commit {baseline.get('machine', {}).get('commit', 'unknown')}):")
+        for row in compare(results, baseline, args.threshold):
+            flag = "  REGRESSION" if row['regression'] else ""
+            print(f"{row['name']:<45} {row['baseline'] * 1000:>10.3f} -> {row['median'] * 1000:>10.3f} ms "
+                  f"{row['change']:>+8.1%}{flag}")
+            if row['regression']:
+                regressions.append(row['name'])
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline saved to {args.baseline}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
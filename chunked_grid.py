@@ -0,0 +1,182 @@
+"""
+Chunked 4D level grid for very large levels.
+
+A dense LevelGrid needs size⁴ bytes, and the flat-graph solvers several
+times that, which rules out sizes around 100 (10⁸ cells). ChunkedGrid
+splits the level into TILE⁴ tiles. Tiles that are entirely open or
+entirely wall are stored only as a flag in `kinds`. Mixed tiles keep their
+walls packed one bit per cell as a (TILE, TILE, TILE) uint8 array, where
+bit j of each byte is the cell at t offset j. The arrays can be
+memory-mapped straight from a `.tbc` file (see level_format).
+
+Cells of edge tiles that lie outside the level are stored as walls, so
+every tile is a full TILE⁴ block.
+"""
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from level_grid import LevelGrid
+
+TILE = 8  # Tile edge; one byte holds a tile's cells along T
+
+OPEN_TILE = 0
+WALL_TILE = 1
+MIXED_TILE = 2
+
+ALL_WALL = 0xFF
+
+# Set bits per byte value
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def tiles_per_side(size: int) -> int:
+    return -(-size // TILE)
+
+
+def locate(size: int, pos: Sequence[int]) -> Tuple[int, Tuple[int, int, int], int]:
+    """Tile index, in-tile (x, y, z) and T bit mask of a position."""
+    n = tiles_per_side(size)
+    x, y, z, t = pos
+    tile = ((x // TILE * n + y // TILE) * n + z // TILE) * n + t // TILE
+    return tile, (x % TILE, y % TILE, z % TILE), 1 << (t % TILE)
+
+
+def in_bounds_bits(size: int, tile_coords: np.ndarray) -> np.ndarray:
+    """
+    In-bounds cell masks of tiles, packed like tile walls.
+    tile_coords: (k, 4) tile coordinates. Returns (k, TILE, TILE, TILE) uint8.
+    """
+    offsets = np.arange(TILE)
+    inside = [(tile_coords[:, dim, None] * TILE + offsets) < size for dim in range(4)]  # (k, TILE) each
+    t_bits = np.packbits(inside[3], axis=-1, bitorder='little')[:, 0]
+    mask = inside[0][:, :, None, None] & inside[1][:, None, :, None] & inside[2][:, None, None, :]
+    return np.where(mask, t_bits[:, None, None, None], 0).astype(np.uint8)
+
+
+class ChunkedGrid:
+    """
+    Tiled 4D occupancy grid: per-tile kind flags plus packed bits for the
+    mixed tiles. `bits[slots[tile]]` are the walls of a mixed tile.
+    """
+
+    def __init__(self, size: int, kinds: np.ndarray, bits: np.ndarray):
+        self.size = size
+        self.tiles_per_side = tiles_per_side(size)
+        self.tile_count = self.tiles_per_side ** 4
+        if kinds.shape != (self.tile_count,):
+            raise ValueError(f"Expected {self.tile_count} tile kinds, got {kinds.shape}")
+        self.kinds = kinds
+        mixed = kinds == MIXED_TILE
+        if bits.shape != (int(np.count_nonzero(mixed)), TILE, TILE, TILE):
+            raise ValueError(f"Tile bits shape {bits.shape} does not match {np.count_nonzero(mixed)} mixed tiles")
+        self.bits = bits
+        self.slots = np.where(mixed, np.cumsum(mixed) - 1, -1).astype(np.int64)
+
+    @classmethod
+    def from_tile_walls(cls, size: int, walls: np.ndarray) -> 'ChunkedGrid':
+        """
+        Build from the packed walls of every tile, shape (tile_count, TILE,
+        TILE, TILE), with out-of-bounds cells already set. Uniform tiles are
+        reduced to flags.
+        """
+        flat = walls.reshape(len(walls), -1)
+        kinds = np.full(len(walls), MIXED_TILE, dtype=np.uint8)
+        kinds[(flat == 0).all(axis=1)] = OPEN_TILE
+        kinds[(flat == ALL_WALL).all(axis=1)] = WALL_TILE
+        return cls(size, kinds, np.ascontiguousarray(walls[kinds == MIXED_TILE]))
+
+    @classmethod
+    def from_level_grid(cls, grid: LevelGrid) -> 'ChunkedGrid':
+        n = tiles_per_side(grid.size)
+        padded = np.ones((n * TILE,) * 4, dtype=bool)
+        padded[(slice(0, grid.size),) * 4] = grid.cells
+        # (x, y, z, t) -> (tile x, tile y, tile z, tile t, x, y, z, t)
+        tiles = padded.reshape(n, TILE, n, TILE, n, TILE, n, TILE).transpose(0, 2, 4, 6, 1, 3, 5, 7)
+        walls = np.packbits(tiles, axis=-1, bitorder='little')[..., 0]
+        return cls.from_tile_walls(grid.size, walls.reshape(-1, TILE, TILE, TILE))
+
+    def to_level_grid(self) -> LevelGrid:
+        """Expand into a dense LevelGrid (only sensible for sizes that fit in memory)."""
+        n = self.tiles_per_side
+        walls = self.tile_walls(np.arange(self.tile_count))
+        cells = np.unpackbits(walls[..., None], axis=-1, bitorder='little').astype(bool)
+        cells = cells.reshape(n, n, n, n, TILE, TILE, TILE, TILE).transpose(0, 4, 1, 5, 2, 6, 3, 7)
+        cells = cells.reshape((n * TILE,) * 4)[(slice(0, self.size),) * 4]
+        return LevelGrid(self.size, np.ascontiguousarray(cells))
+
+    @property
+    def mixed_count(self) -> int:
+        return len(self.bits)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the tile flags and packed tiles."""
+        return self.kinds.nbytes + self.bits.nbytes
+
+    @property
+    def cell_count(self) -> int:
+        return self.size ** 4
+
+    @property
+    def wall_count(self) -> int:
+        # Out-of-bounds cells are stored as walls and must not be counted
+        coords = np.stack(np.unravel_index(np.arange(self.tile_count), (self.tiles_per_side,) * 4), axis=1)
+        outside = TILE ** 4 - POPCOUNT[in_bounds_bits(self.size, coords)].reshape(self.tile_count, -1).sum(axis=1)
+        full = TILE ** 4 - outside[self.kinds == WALL_TILE]
+        mixed = POPCOUNT[self.bits].reshape(self.mixed_count, -1).sum(axis=1) - outside[self.kinds == MIXED_TILE]
+        return int(full.sum() + mixed.sum())
+
+    def tile_walls(self, tiles: np.ndarray) -> np.ndarray:
+        """Packed walls of the given tiles, shape (k, TILE, TILE, TILE)."""
+        tiles = np.asarray(tiles)
+        kinds = self.kinds[tiles]
+        walls = np.zeros((len(tiles), TILE, TILE, TILE), dtype=np.uint8)
+        walls[kinds == WALL_TILE] = ALL_WALL
+        mixed = kinds == MIXED_TILE
+        walls[mixed] = self.bits[self.slots[tiles[mixed]]]
+        return walls
+
+    def open_bits(self) -> np.ndarray:
+        """Packed open cells of every tile, shape (tile_count, TILE, TILE, TILE)."""
+        open_bits = np.zeros((self.tile_count, TILE, TILE, TILE), dtype=np.uint8)
+        open_bits[self.kinds == OPEN_TILE] = ALL_WALL
+        open_bits[self.kinds == MIXED_TILE] = ~self.bits
+        return open_bits
+
+    def locate(self, pos: Sequence[int]) -> Tuple[int, Tuple[int, int, int], int]:
+        return locate(self.size, pos)
+
+    def in_bounds(self, pos: Sequence[int]) -> bool:
+        return all(0 <= p < self.size for p in pos)
+
+    def is_wall(self, pos: Sequence[int]) -> bool:
+        """Check if an in-bounds position is a wall."""
+        tile, local, bit = self.locate(pos)
+        kind = self.kinds[tile]
+        if kind != MIXED_TILE:
+            return bool(kind == WALL_TILE)
+        return bool(self.bits[self.slots[tile]][local] & bit)
+
+    def is_open(self, pos: Sequence[int]) -> bool:
+        return self.in_bounds(pos) and not self.is_wall(pos)
+
+    def tile_neighbors(self) -> np.ndarray:
+        """
+        Neighbouring tile of every tile in each direction, shape
+        (tile_count, 8) in level_grid.DIRECTIONS order (+X, -X, ..., -T).
+        -1 marks the level edge and all-wall tiles, which nothing can enter.
+        """
+        n = self.tiles_per_side
+        coords = np.unravel_index(np.arange(self.tile_count), (n,) * 4)
+        strides = (n ** 3, n ** 2, n, 1)
+        neighbors = np.full((self.tile_count, 8), -1, dtype=np.int64)
+        index = np.arange(self.tile_count)
+        for dim in range(4):
+            for column, delta in ((2 * dim, 1), (2 * dim + 1, -1)):
+                inside = (coords[dim] + delta >= 0) & (coords[dim] + delta < n)
+                neighbors[inside, column] = index[inside] + delta * strides[dim]
+        walled = neighbors >= 0
+        walled[walled] = self.kinds[neighbors[walled]] == WALL_TILE
+        neighbors[walled] = -1
+        return neighbors
@@ -0,0 +1,72 @@
+import numpy as np
+import pygame
+
+
+class PlaneOverview:
+    """
+    Thumbnails of all six planes through the player's position.
+    Each thumbnail is built from the grid's zero-copy plane_slice view:
+    the bool view is reinterpreted as uint8 and blitted into an 8-bit
+    palette Surface (0 = path, 1 = wall, 2 = goal), which is scaled to
+    the thumbnail size. A thumbnail only depends on its plane's fixed
+    coordinates, so a move rebuilds just the planes that have the moved
+    axis fixed; the others only get their player marker moved.
+    """
+
+    def __init__(self, grid, goal_pos, planes, thumb_size, path_color, wall_color, goal_color,
+                 player_color):
+        self.grid = grid
+        self.goal_pos = goal_pos
+        self.planes = planes
+        self.cell = max(1, thumb_size // grid.size)
+        self.extent = self.cell * grid.size
+        self.player_color = player_color
+        self.goal_color = goal_color
+        self.palette = [path_color, wall_color, goal_color] + [wall_color] * 253
+        self.slice_surface = self.palette_surface(grid.size)
+        self.keys = {}
+        self.thumbnails = {}
+        self.rebuilds = 0
+
+    def palette_surface(self, extent):
+        surface = pygame.Surface((extent, extent), depth=8)
+        surface.set_palette(self.palette)
+        return surface
+
+    def key(self, plane, pos):
+        return tuple(pos[dim] for dim in self.planes[plane]['fixed'])
+
+    def thumbnail(self, plane, pos):
+        """The plane's walls and goal through `pos`, rebuilt only if its fixed coordinates changed."""
+        key = self.key(plane, pos)
+        if self.keys.get(plane) == key:
+            return self.thumbnails[plane]
+
+        self.rebuilds += 1
+        view = self.grid.plane_slice(plane, pos)  # (horizontal, vertical), shares the grid's memory
+        pygame.surfarray.blit_array(self.slice_surface, view.view(np.uint8))
+        thumbnail = self.thumbnails.get(plane)
+        if thumbnail is None:
+            thumbnail = self.palette_surface(self.extent)
+        pygame.transform.scale(self.slice_surface, (self.extent, self.extent), thumbnail)
+
+        moving_dims = self.planes[plane]['dims']
+        if all(self.goal_pos[dim] == pos[dim] for dim in self.planes[plane]['fixed']):
+            gx, gy = self.goal_pos[moving_dims[0]], self.goal_pos[moving_dims[1]]
+            thumbnail.fill(self.goal_color, (gx * self.cell, gy * self.cell, self.cell, self.cell))
+
+        self.keys[plane] = key
+        self.thumbnails[plane] = thumbnail
+        return thumbnail
+
+    def draw(self, screen, plane, pos, rect):
+        """
+        Blit the plane's thumbnail through `pos` at the top-left of `rect`
+        with the player marked. Returns the thumbnail's screen rect.
+        """
+        drawn = screen.blit(self.thumbnail(plane, pos), rect)
+        moving_dims = self.planes[plane]['dims']
+        x = drawn.x + pos[moving_dims[0]] * self.cell
+        y = drawn.y + pos[moving_dims[1]] * self.cell
+        screen.fill(self.player_color, (x, y, self.cell, self.cell))
+        return drawn
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+
+class SliceCache:
+    """
+    LRU cache of rendered 2D maze slices.
+    A slice only depends on the plane and the player's two fixed
+    coordinates, so it is drawn once into an off-screen Surface and then
+    reused with a single blit until the player leaves it.
+    """
+
+    def __init__(self, grid, goal_pos, planes, block_size, path_color, wall_color, goal_color,
+                 line_color, capacity=32):
+        self.grid = grid
+        self.goal_pos = goal_pos
+        self.planes = planes
+        self.block_size = block_size
+        self.path_color = path_color
+        self.wall_color = wall_color
+        self.goal_color = goal_color
+        self.line_color = line_color
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, plane, pos):
+        """Cache key of the slice through `pos`: plane plus fixed coordinates."""
+        return (plane,) + tuple(pos[dim] for dim in self.planes[plane]['fixed'])
+
+    def get(self, plane, pos):
+        """Return the rendered Surface of the slice through `pos`."""
+        key = self.key(plane, pos)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.render(plane, pos)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def render(self, plane, pos):
+        """Draw one slice: open cells, walls, goal and cell outlines."""
+        size = self.grid.size
+        block = self.block_size
+        extent = size * block
+        surface = pygame.Surface((extent, extent))
+        surface.fill(self.path_color)
+
+        for i, j in np.argwhere(self.grid.plane_slice(plane, pos)):
+            pygame.draw.rect(surface, self.wall_color, (i * block, j * block, block, block))
+
+        moving_dims = self.planes[plane]['dims']
+        fixed_dims = self.planes[plane]['fixed']
+        if all(self.goal_pos[dim] == pos[dim] for dim in fixed_dims):
+            gx, gy = self.goal_pos[moving_dims[0]], self.goal_pos[moving_dims[1]]
+            pygame.draw.rect(surface, self.goal_color, (gx * block, gy * block, block, block))
+
+        # 1px outline around every cell
+        for k in range(size):
+            for edge in (k * block, k * block + block - 1):
+                pygame.draw.line(surface, self.line_color, (edge, 0), (edge, extent - 1))
+                pygame.draw.line(surface, self.line_color, (0, edge), (extent - 1, edge))
+        return surface.convert() if pygame.display.get_surface() else surface
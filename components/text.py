@@ -1,53 +1,126 @@
+from collections import OrderedDict
 
+import pygame
 
 
-def ShowGoal(font, FONT_COLOR, DIM_COLORS, goal_pos, screen):
+class TextCache:
+    """
+    Bounded LRU of rendered text Surfaces keyed by (font, text, color).
+    Multi-colored lines are laid out once and cached as a single Surface.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, build):
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = build()
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def render(self, font, text, color):
+        """Rendered antialiased text, from the cache when possible."""
+        return self._lookup((font, text, color), lambda: font.render(text, True, color))
+
+    def render_line(self, font, segments):
+        """A line of (text, color) segments composed side by side into one Surface."""
+        segments = tuple(segments)
+
+        def build():
+            parts = [self.render(font, text, color) for text, color in segments]
+            line = pygame.Surface((sum(part.get_width() for part in parts),
+                                   max(part.get_height() for part in parts)), pygame.SRCALPHA)
+            x_pos = 0
+            for part in parts:
+                # Segments never overlap, so copy pixels and alpha unblended
+                line.blit(part, (x_pos, 0), special_flags=pygame.BLEND_RGBA_MAX)
+                x_pos += part.get_width()
+            return line
+
+        return self._lookup((font, segments), build)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self.surfaces)
+        }
+
+
+text_cache = TextCache()
+
+
+class HudLine:
+    """
+    A line of text at a fixed screen position that remembers what it last
+    drew, so it is only redrawn when its contents change.
+    """
+
+    def __init__(self, pos):
+        self.pos = pos
+        self.segments = None
+        self.rect = None
+
+    def draw(self, screen, font, segments, background=None, force=False):
+        """
+        Draw the line and return the screen rect that changed, or None if
+        the contents are unchanged. With a background color the previous
+        text is cleared first; without one the line is always drawn.
+        """
+        segments = tuple(segments)
+        if background is not None and not force and segments == self.segments:
+            return None
+
+        surface = text_cache.render_line(font, segments)
+        rect = surface.get_rect(topleft=self.pos)
+        dirty = rect if self.rect is None else rect.union(self.rect)
+        if background is not None and self.rect is not None:
+            screen.fill(background, self.rect)
+        screen.blit(surface, rect)
+        self.segments = segments
+        self.rect = rect
+        return dirty
+
+
+GOAL_LINE = HudLine((10, 10))
+POSITION_LINE = HudLine((10, 40))  # Position below goal text
+
+
+def coordinate_segments(label, pos, FONT_COLOR, DIM_COLORS):
+    """Segments for 'label X:.. Y:.. Z:.. T:..', one color per dimension."""
+    return (
+        (label, FONT_COLOR),
+        ("X:" + str(pos[0]), DIM_COLORS['X']),   # Red
+        (" Y:" + str(pos[1]), DIM_COLORS['Y']),  # Green
+        (" Z:" + str(pos[2]), DIM_COLORS['Z']),  # Blue
+        (" T:" + str(pos[3]), DIM_COLORS['T'])   # Yellow
+    )
+
+
+def ShowGoal(font, FONT_COLOR, DIM_COLORS, goal_pos, screen, background=None, force=False):
     """Show the goal position in the top left corner of the screen"""
-    
-    # Add goal text at the top with different colors for each coordinate
-    base_text = font.render("Goal: ", True, FONT_COLOR)
-    x_text = font.render("X:" + str(goal_pos[0]), True, DIM_COLORS['X'])  # Red
-    y_text = font.render(" Y:" + str(goal_pos[1]), True, DIM_COLORS['Y'])  # Green
-    z_text = font.render(" Z:" + str(goal_pos[2]), True, DIM_COLORS['Z'])  # Blue
-    t_text = font.render(" T:" + str(goal_pos[3]), True, DIM_COLORS['T'])  # Yellow
-
-    # Calculate positions and blit each segment
-    x_pos = 10
-    y_pos = 10
-    screen.blit(base_text, (x_pos, y_pos))
-    x_pos += base_text.get_width()
-    screen.blit(x_text, (x_pos, y_pos))
-    x_pos += x_text.get_width()
-    screen.blit(y_text, (x_pos, y_pos))
-    x_pos += y_text.get_width()
-    screen.blit(z_text, (x_pos, y_pos))
-    x_pos += z_text.get_width()
-    screen.blit(t_text, (x_pos, y_pos))
-
-
-def ShowPosition(font, FONT_COLOR, player_pos, screen, DIM_COLORS, current_plane):
+    segments = coordinate_segments("Goal: ", goal_pos, FONT_COLOR, DIM_COLORS)
+    return GOAL_LINE.draw(screen, font, segments, background, force)
+
+
+def ShowPosition(font, FONT_COLOR, player_pos, screen, DIM_COLORS, current_plane, background=None, force=False):
     """Show the player's position right under the goal position"""
-    base_text = font.render("Pos: ", True, FONT_COLOR)
-    x_text = font.render("X:" + str(player_pos[0]), True, DIM_COLORS['X'])  # Red
-    y_text = font.render(" Y:" + str(player_pos[1]), True, DIM_COLORS['Y'])  # Green
-    z_text = font.render(" Z:" + str(player_pos[2]), True, DIM_COLORS['Z'])  # Blue
-    t_text = font.render(" T:" + str(player_pos[3]), True, DIM_COLORS['T'])  # Yellow
-    plane_text = font.render(" | Plane:" + current_plane, True, FONT_COLOR)
-
-    # Calculate positions and blit each segment
-    x_pos = 10
-    y_pos = 40  # Position below goal text
-    screen.blit(base_text, (x_pos, y_pos))
-    x_pos += base_text.get_width()
-    screen.blit(x_text, (x_pos, y_pos))
-    x_pos += x_text.get_width()
-    screen.blit(y_text, (x_pos, y_pos))
-    x_pos += y_text.get_width()
-    screen.blit(z_text, (x_pos, y_pos))
-    x_pos += z_text.get_width()
-    screen.blit(t_text, (x_pos, y_pos))
-    x_pos += t_text.get_width()
-    screen.blit(plane_text, (x_pos, y_pos))
+    segments = coordinate_segments("Pos: ", player_pos, FONT_COLOR, DIM_COLORS) + (
+        (" | Plane:" + current_plane, FONT_COLOR),
+    )
+    return POSITION_LINE.draw(screen, font, segments, background, force)
 
 
 
@@ -63,13 +136,13 @@ def ShowInstructions(pygame,SCREEN_WIDTH, SCREEN_HEIGHT, screen, font, FONT_COLO
             "Use arrow keys to move.",
             "Use 1-6 to switch planes (XY, XZ, XT, YZ, YT, ZT).",
             "Find your way to the goal!",
+            "Press 'h' for a hint, 'o' for the plane overview.",
             "Press 'i' to close this menu."
         ]
 
         y_offset = 0
         for line in instruction_text:
-            text_surface = small_font.render(line, True, BLACK)
+            text_surface = text_cache.render(small_font, line, BLACK)
             text_rect = text_surface.get_rect(center=(instructions_box.centerx, instructions_box.centery + y_offset))
             screen.blit(text_surface, text_rect)
             y_offset += 30
-
@@ -0,0 +1,220 @@
+"""
+Headless game state and move-log replay.
+
+GameState holds everything a run needs (position, plane, steps, win) and
+applies the same movement rules as the game, without pygame, so runs can
+be simulated and checked without a display. Every move and plane switch
+that changes the state is appended to a move log, which packs two actions
+per byte.
+
+The verifier replays logs against their levels on the solver's padded
+flat graph and checks that each one reaches the goal in exactly the
+number of steps recorded on the leaderboard:
+
+    python3 game_state.py verify
+    python3 game_state.py verify --db leaderboard.db --levels levels
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from leaderboard import Leaderboard
+from level_format import find_level_file, load_level
+from level_grid import LevelGrid, PLANES
+from solve import FlatGraph
+
+# (horizontal, vertical) movement within the current plane, in move-code order
+MOVES = ((0, -1), (0, 1), (-1, 0), (1, 0))  # up, down, left, right
+PLANE_NAMES = tuple(PLANES)
+
+# Action codes: 0-3 are MOVES, then one code per plane switch
+SWITCH_BASE = len(MOVES)
+PAD = 0xF  # Fills the last nibble of an odd-length log
+
+
+def pack_log(codes: Sequence[int]) -> bytes:
+    """Pack action codes two per byte (first action in the high nibble)."""
+    codes = list(codes)
+    if len(codes) % 2:
+        codes.append(PAD)
+    return bytes((codes[i] << 4) | codes[i + 1] for i in range(0, len(codes), 2))
+
+
+def unpack_log(log: bytes) -> List[int]:
+    """Action codes of a packed move log."""
+    codes = []
+    for byte in log:
+        codes.append(byte >> 4)
+        codes.append(byte & 0xF)
+    if codes and codes[-1] == PAD:
+        codes.pop()
+    return codes
+
+
+class GameState:
+    """Player state of one run through a level."""
+
+    def __init__(self, grid: LevelGrid, start: Sequence[int], goal: Sequence[int], plane: str = 'XY'):
+        self.grid = grid
+        self.size = grid.size
+        self.start = list(start)
+        self.goal = list(goal)
+        self.start_plane = plane
+        self.reset()
+
+    @classmethod
+    def from_level_data(cls, level_data: Dict) -> 'GameState':
+        return cls(LevelGrid.from_level_data(level_data), level_data['start'], level_data['goal'])
+
+    def reset(self):
+        """Go back to the start with no steps taken."""
+        self.pos = self.start.copy()
+        self.plane = self.start_plane
+        self.steps = 0
+        self.codes = []
+
+    @property
+    def won(self) -> bool:
+        return self.pos == self.goal
+
+    @property
+    def log(self) -> bytes:
+        """The packed move log of the run so far."""
+        return pack_log(self.codes)
+
+    def move(self, dh: int, dv: int) -> bool:
+        """
+        Move one block within the current plane. Returns False (and leaves
+        the state unchanged) if the move is blocked or the run is over.
+        """
+        if self.won:
+            return False
+        moving_dims = PLANES[self.plane]['dims']
+        new_pos = self.pos.copy()
+        new_pos[moving_dims[0]] += dh
+        new_pos[moving_dims[1]] += dv
+        if not self.grid.is_open(new_pos):
+            return False
+        self.pos = new_pos
+        self.steps += 1
+        self.codes.append(MOVES.index((dh, dv)))
+        return True
+
+    def switch_plane(self, plane: str) -> bool:
+        """Switch to another plane, keeping the position. Returns whether it changed."""
+        if plane not in PLANES or plane == self.plane or self.won:
+            return False
+        self.plane = plane
+        self.codes.append(SWITCH_BASE + PLANE_NAMES.index(plane))
+        return True
+
+
+class Replayer:
+    """Replays move logs on one level using flat-index arithmetic."""
+
+    def __init__(self, level_data: Dict):
+        self.graph = FlatGraph(LevelGrid.from_level_data(level_data))
+        self.start = self.graph.index(level_data['start'])
+        self.goal = self.graph.index(level_data['goal'])
+        # offsets[plane][move code]: flat offset of each move in each plane
+        offset_of = {(dim, delta): self.graph.strides[dim] * delta for dim in range(4) for delta in (1, -1)}
+        self.offsets = []
+        for name in PLANE_NAMES:
+            h_dim, v_dim = PLANES[name]['dims']
+            self.offsets.append(tuple(offset_of[(h_dim, dh)] if dh else offset_of[(v_dim, dv)]
+                                      for dh, dv in MOVES))
+
+    def replay(self, log: bytes, plane: str = 'XY') -> Optional[int]:
+        """
+        Replay a log and return its step count, or None if it is not a
+        valid winning run (a blocked move, an action after reaching the
+        goal, or a run that never reaches it).
+        """
+        open_cells, goal = self.graph.open, self.goal
+        offsets = self.offsets[PLANE_NAMES.index(plane)]
+        i = self.start
+        steps = 0
+        for code in unpack_log(log):
+            if i == goal:
+                return None
+            if code < SWITCH_BASE:
+                i += offsets[code]
+                if not open_cells[i]:
+                    return None
+                steps += 1
+            elif code - SWITCH_BASE < len(PLANE_NAMES):
+                offsets = self.offsets[code - SWITCH_BASE]
+            else:
+                return None
+        return steps if i == goal else None
+
+
+class RunCheck(NamedTuple):
+    level_id: str
+    run_id: int
+    claimed_steps: int
+    replayed_steps: Optional[int]
+    status: str  # 'valid', 'invalid', 'no log' or 'no level'
+
+
+def verify_runs(runs: Iterable[Dict], levels_path: Path = Path("levels")) -> List[RunCheck]:
+    """
+    Replay each run's move log against its level and compare the step
+    count with the recorded one. Levels are loaded once per level id.
+    """
+    replayers = {}
+    checks = []
+    for run in runs:
+        level_id = str(run['level_id'])
+        if not run.get('moves'):
+            checks.append(RunCheck(level_id, run['id'], run['steps'], None, 'no log'))
+            continue
+        if level_id not in replayers:
+            level_file = find_level_file(levels_path, level_id)
+            replayers[level_id] = Replayer(load_level(level_file)) if level_file.exists() else None
+        replayer = replayers[level_id]
+        if replayer is None:
+            checks.append(RunCheck(level_id, run['id'], run['steps'], None, 'no level'))
+            continue
+        steps = replayer.replay(run['moves'])
+        status = 'valid' if steps is not None and steps == run['steps'] else 'invalid'
+        checks.append(RunCheck(level_id, run['id'], run['steps'], steps, status))
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless game state tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    verify_parser = subparsers.add_parser('verify', help='Replay leaderboard runs and check their step counts')
+    verify_parser.add_argument('--db', type=Path, default=Path('leaderboard.db'),
+                               help='Leaderboard database (default: leaderboard.db)')
+    verify_parser.add_argument('--levels', type=Path, default=Path("levels"),
+                               help='Levels directory (default: levels)')
+    verify_parser.add_argument('--level_id', type=str, help='Only verify runs of this level')
+    args = parser.parse_args()
+
+    leaderboard = Leaderboard(args.db, legacy_file=None)
+    runs = leaderboard.runs(args.level_id)
+    leaderboard.close()
+
+    start_time = time.perf_counter()
+    checks = verify_runs(runs, args.levels)
+    elapsed = time.perf_counter() - start_time
+
+    counts = {}
+    for check in checks:
+        counts[check.status] = counts.get(check.status, 0) + 1
+        if check.status == 'invalid':
+            replayed = f"{check.replayed_steps} steps" if check.replayed_steps is not None else "no valid win"
+            print(f"Level {check.level_id} run {check.run_id}: claimed {check.claimed_steps} steps, replay gives {replayed}")
+        elif check.status == 'no level':
+            print(f"Level {check.level_id} run {check.run_id}: level file not found")
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    rate = len(checks) / elapsed if elapsed > 0 else float('inf')
+    print(f"Checked {len(checks)} runs in {elapsed:.3f}s ({rate:.0f} runs/s): {summary or 'no runs'}")
+    raise SystemExit(1 if counts.get('invalid') else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Next-move hints from a precomputed goal-distance field.
+
+The BFS distance from the goal to every cell is computed once per level
+(solve.distance_field) and stored next to the level file as a compressed
+`.hints.npz`, keyed by the level file's mtime and byte size. From it,
+HintField derives a bit mask of every shortest step for every cell, so a
+hint is one array read for the player's position plus a check against the
+current plane, which prefers a step the player can take without switching.
+"""
+import os
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from level_grid import DIRECTIONS, LevelGrid, PLANES
+from solve import distance_field
+
+HINT_SUFFIX = '.hints.npz'
+
+
+class Hint(NamedTuple):
+    kind: str  # 'move', 'switch', 'goal' or 'unreachable'
+    distance: int  # Steps left to the goal (-1 if unreachable)
+    direction: Optional[Tuple[int, int]] = None  # (horizontal, vertical) for 'move'
+    target: Optional[Tuple[int, ...]] = None  # Cell to step into for 'move'
+    plane: Optional[str] = None  # Plane to switch to for 'switch'
+
+
+def hint_path(level_file: Union[str, Path]) -> Path:
+    """Where the hint field of a level file is stored."""
+    level_file = Path(level_file)
+    return level_file.with_name(level_file.stem + HINT_SUFFIX)
+
+
+def _shifted(field: np.ndarray, dim: int, delta: int, fill: int) -> np.ndarray:
+    """field shifted so result[pos] == field[pos + delta along dim] (fill past the edge)."""
+    result = np.full_like(field, fill)
+    target = [slice(None)] * field.ndim
+    source = [slice(None)] * field.ndim
+    if delta > 0:
+        target[dim], source[dim] = slice(None, -delta), slice(delta, None)
+    else:
+        target[dim], source[dim] = slice(-delta, None), slice(None, delta)
+    result[tuple(target)] = field[tuple(source)]
+    return result
+
+
+class HintField:
+    """Goal distances and every first step of a shortest path from every cell."""
+
+    def __init__(self, distance: np.ndarray):
+        self.distance = distance
+        # Bit `code` is set where a step in DIRECTIONS[code] gets one closer to the goal;
+        # 0 for walls, the goal and unreachable cells
+        self.next_dirs = np.zeros(distance.shape, dtype=np.uint8)
+        for code, (dim, delta) in enumerate(DIRECTIONS):
+            closer = (distance > 0) & (_shifted(distance, dim, delta, -1) == distance - 1)
+            self.next_dirs[closer] |= np.uint8(1 << code)
+
+    @classmethod
+    def compute(cls, level_data: Dict) -> 'HintField':
+        grid = LevelGrid.from_level_data(level_data)
+        return cls(distance_field(grid, level_data['goal']))
+
+    def hint(self, pos: Sequence[int], plane: str) -> Hint:
+        """The best next action from `pos` while viewing `plane`."""
+        pos = tuple(pos)
+        distance = int(self.distance[pos])
+        if distance == 0:
+            return Hint('goal', 0)
+        mask = int(self.next_dirs[pos])
+        if not mask:
+            return Hint('unreachable', -1)
+
+        # Lower direction codes win ties, so hints are deterministic
+        codes = [code for code in range(len(DIRECTIONS)) if mask >> code & 1]
+        moving_dims = PLANES[plane]['dims']
+        for code in codes:
+            dim, delta = DIRECTIONS[code]
+            if dim in moving_dims:
+                direction = (delta, 0) if dim == moving_dims[0] else (0, delta)
+                target = list(pos)
+                target[dim] += delta
+                return Hint('move', distance, direction, tuple(target))
+        # No shortest step in this plane: switch to one that moves along the
+        # first shortest step's axis and keeps one current axis
+        dim, _ = DIRECTIONS[codes[0]]
+        for name, info in PLANES.items():
+            if dim in info['dims'] and moving_dims[0] in info['dims']:
+                return Hint('switch', distance, plane=name)
+        raise AssertionError("every axis pairs with the current horizontal axis")
+
+    def save(self, filename: Union[str, Path], level_file: Union[str, Path]):
+        """Write the distance field compressed, keyed to the level file's mtime and size."""
+        stat = Path(level_file).stat()
+        filename = Path(filename)
+        temp = filename.with_name(filename.name + '.tmp')
+        with open(temp, 'wb') as f:
+            np.savez_compressed(f, distance=self.distance, key=np.array([stat.st_mtime_ns, stat.st_size]))
+        os.replace(temp, filename)  # Readers never see a half-written file
+
+    @classmethod
+    def load(cls, filename: Union[str, Path], level_file: Union[str, Path]) -> Optional['HintField']:
+        """Read a stored field, or None if it is missing or older than the level file."""
+        stat = Path(level_file).stat()
+        try:
+            with np.load(filename) as stored:
+                if stored['key'].tolist() != [stat.st_mtime_ns, stat.st_size]:
+                    return None
+                return cls(stored['distance'])
+        except (FileNotFoundError, ValueError, KeyError, OSError):
+            return None
+
+
+def load_hints(level_file: Union[str, Path], level_data: Dict) -> Optional[HintField]:
+    """
+    The level's hint field, read from its .hints.npz or computed and saved
+    there. Returns None for levels without a dense grid (chunked levels).
+    """
+    if not isinstance(level_data.get('grid'), LevelGrid):
+        return None
+    filename = hint_path(level_file)
+    field = HintField.load(filename, level_file)
+    if field is None:
+        field = HintField.compute(level_data)
+        try:
+            field.save(filename, level_file)
+        except OSError:
+            pass  # Read-only levels directory: use the field without caching it
+    return field
@@ -0,0 +1,134 @@
+"""
+SQLite-backed leaderboard.
+
+Every finished run is kept in a `runs` table indexed on (level_id, steps),
+so top-N per level and the best run of every level are single indexed
+queries. The database runs in WAL mode and each write is its own
+transaction, so two game instances on one machine can record scores
+concurrently without losing each other's runs. The old leaderboard.json
+is imported the first time the database is created. Runs recorded by the
+game also keep their packed move log, so game_state.py can replay them.
+"""
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+LEADERBOARD_DB = 'leaderboard.db'
+LEGACY_LEADERBOARD_FILE = 'leaderboard.json'
+TOP_N = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    level_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    steps INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    moves BLOB
+);
+CREATE INDEX IF NOT EXISTS runs_level_steps ON runs (level_id, steps);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class Leaderboard:
+    """All recorded runs, with top-N and best-per-level queries."""
+
+    def __init__(self, path: Union[str, Path] = LEADERBOARD_DB,
+                 legacy_file: Union[str, Path, None] = LEGACY_LEADERBOARD_FILE):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path), timeout=10)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(runs)")}
+            if "moves" not in columns:  # Databases created before move logs
+                self.conn.execute("ALTER TABLE runs ADD COLUMN moves BLOB")
+        if legacy_file is not None:
+            self.import_json(legacy_file)
+
+    def close(self):
+        self.conn.close()
+
+    def import_json(self, legacy_file: Union[str, Path]) -> int:
+        """Import a leaderboard.json once; returns the number of runs imported."""
+        try:
+            with open(legacy_file, 'r') as f:
+                legacy = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            legacy = {"levels": {}}
+
+        rows = [(str(level_id), score["name"], score["steps"], score["date"])
+                for level_id, scores in legacy.get("levels", {}).items()
+                for score in scores]
+        with self.conn:
+            # The meta row is claimed inside the same transaction as the
+            # import, so concurrent first runs import only once
+            claimed = self.conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('imported_json', ?)", (now(),)
+            ).rowcount
+            if not claimed:
+                return 0
+            self.conn.executemany(
+                "INSERT INTO runs (level_id, name, steps, date) VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def add_run(self, level_id: str, name: str, steps: int, date: Optional[str] = None,
+                moves: Optional[bytes] = None) -> int:
+        """Record a finished run (and its packed move log) atomically; returns its id."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (level_id, name, steps, date, moves) VALUES (?, ?, ?, ?, ?)",
+                (str(level_id), name, steps, date or now(), moves))
+        return cursor.lastrowid
+
+    def top(self, level_id: str, n: int = TOP_N) -> List[Dict]:
+        """The n best runs of a level, fewest steps first (earlier runs win ties)."""
+        rows = self.conn.execute(
+            "SELECT name, steps, date FROM runs WHERE level_id = ? ORDER BY steps, id LIMIT ?",
+            (str(level_id), n))
+        return [dict(row) for row in rows]
+
+    def qualifies(self, level_id: str, steps: int, n: int = TOP_N) -> bool:
+        """Whether a run with this many steps would enter the top n."""
+        row = self.conn.execute(
+            "SELECT steps FROM runs WHERE level_id = ? ORDER BY steps, id LIMIT 1 OFFSET ?",
+            (str(level_id), n - 1)).fetchone()
+        return row is None or steps < row["steps"]
+
+    def best_per_level(self) -> Dict[str, Dict]:
+        """The best run of every level, in one query."""
+        rows = self.conn.execute(
+            """
+            SELECT level_id, name, steps, date FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY level_id ORDER BY steps, id) AS rank
+                FROM runs
+            ) WHERE rank = 1
+            """)
+        return {row["level_id"]: {"name": row["name"], "steps": row["steps"], "date": row["date"]}
+                for row in rows}
+
+    def runs(self, level_id: Optional[str] = None) -> List[Dict]:
+        """Every recorded run (optionally of one level) with its move log."""
+        if level_id is None:
+            rows = self.conn.execute("SELECT id, level_id, steps, moves FROM runs ORDER BY id")
+        else:
+            rows = self.conn.execute("SELECT id, level_id, steps, moves FROM runs WHERE level_id = ? ORDER BY id",
+                                     (str(level_id),))
+        return [dict(row) for row in rows]
+
+    def run_count(self, level_id: Optional[str] = None) -> int:
+        if level_id is None:
+            return self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM runs WHERE level_id = ?",
+                                 (str(level_id),)).fetchone()[0]
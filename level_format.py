@@ -0,0 +1,383 @@
+"""
+Level file formats.
+
+Levels are stored either as JSON (the original, human-readable schema with a
+list of walls) or in a compact binary format (`.tbs`). Binary files start
+with a fixed-size header followed by the wall grid packed one bit per cell.
+An uncompressed file's bits are memory-mapped rather than read, then
+unpacked into the dense `LevelGrid` (one byte per cell in memory).
+
+Binary header (little endian):
+    magic       4s   b'TBS4'
+    version     B    format version
+    flags       B    FLAG_ZLIB if the bit array is zlib-compressed,
+                     FLAG_INT_DIFFICULTY if difficulty is an integer
+    size        H    size of each dimension
+    start       4H   start position
+    goal        4H   goal position
+    difficulty  16s  utf-8 difficulty label, NUL padded
+    payload     I    number of payload bytes following the header
+
+Very large levels use the chunked format (`.tbc`, see chunked_grid): a
+header like the one above, with the tile edge instead of a payload size
+and the number of mixed tiles at the end, then one kind byte per tile and
+the packed walls of each mixed tile. Both arrays are memory-mapped.
+
+Procedural levels (`.tbseed`, see seed_levels) store only the seed and
+generator parameters; their walls are rebuilt when the level is opened.
+"""
+import argparse
+import json
+import re
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from chunked_grid import ChunkedGrid, TILE, tiles_per_side
+from level_grid import LevelGrid
+
+MAGIC = b'TBS4'
+VERSION = 1
+FLAG_ZLIB = 0x01
+FLAG_INT_DIFFICULTY = 0x02
+
+HEADER = struct.Struct('<4sBBH4H4H16sI')
+HEADER_SIZE = HEADER.size
+
+CHUNKED_MAGIC = b'TBC1'
+CHUNKED_VERSION = 1
+# magic, version, flags, size, tile, start, goal, difficulty, mixed tiles
+CHUNKED_HEADER = struct.Struct('<4sBBHB4H4H16sI')
+
+READ_CHUNK = 1 << 20
+
+# progress(stage, fraction) callbacks let callers show a progress bar, and
+# cancel a load by raising from the callback
+Progress = Optional[Callable[[str, float], None]]
+
+JSON_EXTENSION = '.json'
+BINARY_EXTENSION = '.tbs'
+CHUNKED_EXTENSION = '.tbc'  # Not listed with the playable formats below
+SEED_EXTENSION = '.tbseed'
+LEVEL_EXTENSIONS = (BINARY_EXTENSION, JSON_EXTENSION, SEED_EXTENSION)  # Preferred first
+
+
+def is_binary_level(filename: Union[str, Path]) -> bool:
+    """Detect the level format from the file extension."""
+    return Path(filename).suffix == BINARY_EXTENSION
+
+
+def is_chunked_level(filename: Union[str, Path]) -> bool:
+    return Path(filename).suffix == CHUNKED_EXTENSION
+
+
+def is_seed_level(filename: Union[str, Path]) -> bool:
+    return Path(filename).suffix == SEED_EXTENSION
+
+
+def load_level(filename: Union[str, Path], progress: Progress = None) -> Dict:
+    """
+    Load a level from a JSON, binary, chunked or seed file, chosen by
+    extension. The returned dict always carries a ready-built `grid` (a
+    ChunkedGrid for chunked files, otherwise a LevelGrid).
+    """
+    if is_seed_level(filename):
+        from seed_levels import load_seed_level  # seed_levels imports this module
+        level_data = load_seed_level(filename, progress)
+    elif is_chunked_level(filename):
+        level_data = load_chunked_level(filename)
+    elif is_binary_level(filename):
+        level_data = load_binary_level(filename)
+    else:
+        level_data = load_json_level(filename, progress)
+    if progress:
+        progress("Done", 1.0)
+    return level_data
+
+
+def save_level(level_data: Dict, filename: Union[str, Path], compress: bool = False) -> Path:
+    """Save a level to a JSON, binary, chunked or seed file, chosen by extension."""
+    if is_seed_level(filename):
+        from seed_levels import save_seed_level
+        return save_seed_level(level_data, filename)
+    if is_chunked_level(filename):
+        return save_chunked_level(level_data, filename)
+    if is_binary_level(filename):
+        return save_binary_level(level_data, filename, compress)
+    return save_json_level(level_data, filename)
+
+
+def load_json_level(filename: Union[str, Path], progress: Progress = None) -> Dict:
+    """Load a level from the JSON schema written by the level generator."""
+    if progress is None:
+        with open(filename, 'r') as f:
+            level_data = json.load(f)
+    else:
+        total = max(1, Path(filename).stat().st_size)
+        chunks = []
+        read = 0
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+                chunks.append(chunk)
+                read += len(chunk)
+                progress("Reading", 0.5 * read / total)
+        progress("Parsing", 0.5)
+        level_data = json.loads(b''.join(chunks))
+        progress("Building grid", 0.9)
+    level_data['grid'] = LevelGrid.from_level_data(level_data)
+    return level_data
+
+
+def dense_grid(level_data: Dict) -> LevelGrid:
+    """The level's LevelGrid, expanding a chunked grid if necessary."""
+    grid = level_data.get('grid')
+    if isinstance(grid, ChunkedGrid):
+        return grid.to_level_grid()
+    return LevelGrid.from_level_data(level_data)
+
+
+def save_json_level(level_data: Dict, filename: Union[str, Path]) -> Path:
+    """Save a level in the JSON schema, walls listed in sorted order."""
+    grid = dense_grid(level_data)
+    level_json = {
+        "walls": grid.walls(),
+        "start": list(level_data['start']),
+        "goal": list(level_data['goal']),
+        "size": level_data['size'],
+        "difficulty": level_data['difficulty']
+    }
+    with open(filename, 'w') as f:
+        json.dump(level_json, f, indent=4, sort_keys=True)
+    return Path(filename)
+
+
+def read_header(filename: Union[str, Path]) -> Dict:
+    """Read only the header of a binary level file."""
+    with open(filename, 'rb') as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{filename}: truncated level header")
+    fields = HEADER.unpack(raw)
+    magic, version, flags, size = fields[:4]
+    if magic != MAGIC:
+        raise ValueError(f"{filename}: not a binary level file")
+    if version > VERSION:
+        raise ValueError(f"{filename}: unsupported level format version {version}")
+    difficulty = fields[12].rstrip(b'\0').decode('utf-8')
+    if flags & FLAG_INT_DIFFICULTY:
+        difficulty = int(difficulty)
+    return {
+        "version": version,
+        "flags": flags,
+        "size": size,
+        "start": list(fields[4:8]),
+        "goal": list(fields[8:12]),
+        "difficulty": difficulty,
+        "payload": fields[13]
+    }
+
+
+def load_binary_level(filename: Union[str, Path]) -> Dict:
+    """Load a binary level, unpacking its wall bits (memory-mapped when uncompressed) into a dense grid."""
+    header = read_header(filename)
+    size = header['size']
+    cell_count = size ** 4
+
+    if header['flags'] & FLAG_ZLIB:
+        with open(filename, 'rb') as f:
+            f.seek(HEADER_SIZE)
+            packed = np.frombuffer(zlib.decompress(f.read(header['payload'])), dtype=np.uint8)
+    else:
+        packed = np.memmap(filename, dtype=np.uint8, mode='r',
+                           offset=HEADER_SIZE, shape=(header['payload'],))
+
+    cells = np.unpackbits(packed, count=cell_count).view(bool).reshape((size,) * 4)
+    return {
+        "start": header['start'],
+        "goal": header['goal'],
+        "size": size,
+        "difficulty": header['difficulty'],
+        "grid": LevelGrid(size, cells)
+    }
+
+
+def save_binary_level(level_data: Dict, filename: Union[str, Path], compress: bool = False) -> Path:
+    """Save a level in the packed binary format."""
+    grid = dense_grid(level_data)
+    payload = np.packbits(grid.cells.ravel()).tobytes()
+    flags, difficulty = difficulty_field(level_data)
+    if compress:
+        payload = zlib.compress(payload, 9)
+        flags |= FLAG_ZLIB
+
+    header = HEADER.pack(MAGIC, VERSION, flags, grid.size,
+                         *level_data['start'], *level_data['goal'],
+                         difficulty, len(payload))
+    with open(filename, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+    return Path(filename)
+
+
+def difficulty_field(level_data: Dict) -> Tuple[int, bytes]:
+    """Header flags and encoded label for a level's difficulty."""
+    flags = FLAG_INT_DIFFICULTY if isinstance(level_data['difficulty'], int) else 0
+    difficulty = str(level_data['difficulty']).encode('utf-8')
+    if len(difficulty) > 16:
+        raise ValueError(f"Difficulty label too long for binary format: {level_data['difficulty']!r}")
+    return flags, difficulty
+
+
+def read_chunked_header(filename: Union[str, Path]) -> Dict:
+    """Read only the header of a chunked level file."""
+    with open(filename, 'rb') as f:
+        raw = f.read(CHUNKED_HEADER.size)
+    if len(raw) < CHUNKED_HEADER.size:
+        raise ValueError(f"{filename}: truncated level header")
+    fields = CHUNKED_HEADER.unpack(raw)
+    magic, version, flags, size, tile = fields[:5]
+    if magic != CHUNKED_MAGIC:
+        raise ValueError(f"{filename}: not a chunked level file")
+    if version > CHUNKED_VERSION:
+        raise ValueError(f"{filename}: unsupported level format version {version}")
+    if tile != TILE:
+        raise ValueError(f"{filename}: tile edge {tile} is not supported (expected {TILE})")
+    difficulty = fields[13].rstrip(b'\0').decode('utf-8')
+    if flags & FLAG_INT_DIFFICULTY:
+        difficulty = int(difficulty)
+    return {
+        "version": version,
+        "flags": flags,
+        "size": size,
+        "tile": tile,
+        "start": list(fields[5:9]),
+        "goal": list(fields[9:13]),
+        "difficulty": difficulty,
+        "mixed_tiles": fields[14]
+    }
+
+
+def load_chunked_level(filename: Union[str, Path], mmap: bool = True) -> Dict:
+    """Load a chunked level; the tile arrays are memory-mapped unless mmap=False."""
+    header = read_chunked_header(filename)
+    tile_count = tiles_per_side(header['size']) ** 4
+    bits_shape = (header['mixed_tiles'], TILE, TILE, TILE)
+    offset = CHUNKED_HEADER.size
+    if mmap:
+        kinds = np.memmap(filename, dtype=np.uint8, mode='r', offset=offset, shape=(tile_count,))
+        bits = (np.memmap(filename, dtype=np.uint8, mode='r', offset=offset + tile_count, shape=bits_shape)
+                if header['mixed_tiles'] else np.zeros(bits_shape, dtype=np.uint8))
+    else:
+        with open(filename, 'rb') as f:
+            f.seek(offset)
+            kinds = np.fromfile(f, dtype=np.uint8, count=tile_count)
+            bits = np.fromfile(f, dtype=np.uint8, count=int(np.prod(bits_shape))).reshape(bits_shape)
+    return {
+        "start": header['start'],
+        "goal": header['goal'],
+        "size": header['size'],
+        "difficulty": header['difficulty'],
+        "grid": ChunkedGrid(header['size'], kinds, bits)
+    }
+
+
+def save_chunked_level(level_data: Dict, filename: Union[str, Path]) -> Path:
+    """Save a level in the chunked format, converting a dense grid if needed."""
+    grid = level_data.get('grid')
+    if not isinstance(grid, ChunkedGrid):
+        grid = ChunkedGrid.from_level_grid(LevelGrid.from_level_data(level_data))
+    flags, difficulty = difficulty_field(level_data)
+    header = CHUNKED_HEADER.pack(CHUNKED_MAGIC, CHUNKED_VERSION, flags, grid.size, TILE,
+                                 *level_data['start'], *level_data['goal'], difficulty, grid.mixed_count)
+    with open(filename, 'wb') as f:
+        f.write(header)
+        f.write(np.ascontiguousarray(grid.kinds).tobytes())
+        # Written in slices so a memory-mapped source is never copied whole
+        for first in range(0, grid.mixed_count, 4096):
+            f.write(np.ascontiguousarray(grid.bits[first:first + 4096]).tobytes())
+    return Path(filename)
+
+
+def read_level_info(filename: Union[str, Path]) -> Dict:
+    """Read a level's size and difficulty without building its grid (seed files are plain JSON)."""
+    if is_chunked_level(filename):
+        return read_chunked_header(filename)
+    if is_binary_level(filename):
+        return read_header(filename)
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
+def natural_sort_key(path: Union[str, Path]) -> List:
+    """Convert string with numbers into tuple of strings and integers for natural sorting."""
+    parts = re.split('([0-9]+)', Path(path).stem)
+    return [int(part) if part.isdigit() else part.lower() for part in parts]
+
+
+def find_level_file(levels_path: Union[str, Path], level_id: Union[int, str]) -> Path:
+    """Find the file for a level id, preferring the binary format."""
+    for extension in LEVEL_EXTENSIONS:
+        level_file = Path(levels_path) / f"{level_id}{extension}"
+        if level_file.exists():
+            return level_file
+    return Path(levels_path) / f"{level_id}{JSON_EXTENSION}"
+
+
+def list_level_files(levels_path: Union[str, Path]) -> List[Path]:
+    """List level files in a directory, one per level id (binary preferred)."""
+    by_id = {}
+    for extension in reversed(LEVEL_EXTENSIONS):
+        for level_file in Path(levels_path).glob(f"*{extension}"):
+            by_id[level_file.stem] = level_file
+    return list(by_id.values())
+
+
+def convert(files: List[Path], to: str, output_dir: Union[str, Path, None] = None,
+            compress: bool = False) -> List[Path]:
+    """Convert level files to the given format ('binary', 'chunked' or 'json')."""
+    extension = {'binary': BINARY_EXTENSION, 'chunked': CHUNKED_EXTENSION, 'json': JSON_EXTENSION}[to]
+    written = []
+    for level_file in files:
+        level_file = Path(level_file)
+        target_dir = Path(output_dir) if output_dir else level_file.parent
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / (level_file.stem + extension)
+        if target.resolve() == level_file.resolve():
+            continue
+
+        level_data = load_level(level_file)
+        save_level(level_data, target, compress)
+        print(f"{level_file} ({level_file.stat().st_size} bytes) -> "
+              f"{target} ({target.stat().st_size} bytes)")
+        written.append(target)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Level file format tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = subparsers.add_parser('convert', help='Convert levels between JSON and binary')
+    convert_parser.add_argument('files', nargs='+', type=Path, help='Level files to convert')
+    convert_parser.add_argument('--to', choices=['binary', 'chunked', 'json'], default='binary',
+                                help='Target format (default: binary)')
+    convert_parser.add_argument('--compress', action='store_true',
+                                help='zlib-compress the wall bits (binary only, disables mmap)')
+    convert_parser.add_argument('--output-dir', type=Path,
+                                help='Directory for converted files (default: alongside the source)')
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        missing = [f for f in args.files if not f.exists()]
+        if missing:
+            print(f"Error: {', '.join(map(str, missing))} not found!")
+            sys.exit(1)
+        convert(args.files, args.to, args.output_dir, args.compress)
+
+
+if __name__ == "__main__":
+    main()
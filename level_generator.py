@@ -1,99 +1,499 @@
-import random
-import json
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
-from solve import verify_level  # Add this import
+from solve import solve_level, print_stats, store_solution, ALGORITHMS
+from solution_cache import solutions
+from lint import repair_level
+from level_grid import LevelGrid
+from chunked_grid import ChunkedGrid, TILE, in_bounds_bits, locate, tiles_per_side
+import level_format
 import argparse
 import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+DEFAULT_MAX_ATTEMPTS = 100
 
-def generate_level(wall_percentage, size):
+def generate_level(wall_percentage, size, rng=None):
     """
     Generate a 4D maze level with specified difficulty
-    difficulty: 1-5 (affects number of walls and complexity)
+    wall_percentage: share of cells (0-1) that become walls
     size: size of each dimension (can vary per difficulty)
+    rng: numpy Generator to draw from (default: fresh unseeded one)
     """
+    if rng is None:
+        rng = np.random.default_rng()
     
     # Adjust number of walls based on size and difficulty
     # Use a percentage that scales with difficulty but considers total space
-    num_walls = int((size ** 4) * wall_percentage)
-    
-    # Initialize empty 4D space
-    walls = []
-    
-    # Generate walls based on difficulty
-    max_coord = size - 1
-    while len(walls) < num_walls:
-        wall = [
-            random.randint(0, max_coord),
-            random.randint(0, max_coord),
-            random.randint(0, max_coord),
-            random.randint(0, max_coord)
-        ]
-        if wall not in walls:
-            walls.append(wall)
+    cell_count = size ** 4
+    num_walls = min(int(cell_count * wall_percentage), cell_count - 2)
     
     # Generate start and goal positions
     start = [0, 0, 0, 0]  # Always start at origin
     
     # Ensure min_coord doesn't go below 0
+    max_coord = size - 1
     min_coord = max(0, max_coord//2)  # Goal between 1/2 and end of space
-    goal = [
-        random.randint(min_coord, max_coord),
-        random.randint(min_coord, max_coord),
-        random.randint(min_coord, max_coord),
-        random.randint(min_coord, max_coord)
-    ]
+    goal = [int(c) for c in rng.integers(min_coord, max_coord, size=4, endpoint=True)]
     
-    # Ensure start and goal aren't walls
-    if start in walls:
-        walls.remove(start)
-    if goal in walls:
-        walls.remove(goal)
+    # Sample wall cells without replacement over flat indices, drawing two
+    # spares so start and goal can be dropped from the sample
+    grid = LevelGrid(size)
+    kept = {grid.flat_index(start), grid.flat_index(goal)}
+    candidates = rng.choice(cell_count, size=min(num_walls + 2, cell_count), replace=False)
+    walls = candidates[~np.isin(candidates, list(kept))][:num_walls]
+    grid.cells.ravel()[walls] = True
     
     level_data = {
-        "walls": walls,
         "start": start,
         "goal": goal,
         "size": size,
-        "difficulty": str(int(wall_percentage * 100)) + "%"
+        "difficulty": str(int(wall_percentage * 100)) + "%",
+        "grid": grid
     }
     return level_data
         
 
-def save_level(level_data, level_number):
-    """Save level data to JSON file"""
+CHUNK_BATCH = 2048  # Tiles generated per batch by generate_chunked_level
+
+FILE_EXTENSIONS = {
+    'json': level_format.JSON_EXTENSION,
+    'binary': level_format.BINARY_EXTENSION,
+    'chunked': level_format.CHUNKED_EXTENSION,
+    'seed': level_format.SEED_EXTENSION
+}
+LEVEL_FILE_MODE = 0o644
+
+SEED_GENERATOR_VERSION = 1  # Bump whenever a seeded level would come out differently
+
+
+def generate_chunked_level(wall_percentage, size, rng=None):
+    """
+    Generate a level as a ChunkedGrid, for sizes too large for a dense grid.
+    Tiles are generated a batch at a time, so memory stays proportional
+    to the packed level. Each cell is a wall with probability
+    wall_percentage (instead of an exact wall count as in generate_level);
+    start and goal are chosen the same way and always left open.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    start = [0, 0, 0, 0]
+    max_coord = size - 1
+    min_coord = max(0, max_coord//2)
+    goal = [int(c) for c in rng.integers(min_coord, max_coord, size=4, endpoint=True)]
+
+    n = tiles_per_side(size)
+    tile_count = n ** 4
+    walls = np.empty((tile_count, TILE, TILE, TILE), dtype=np.uint8)
+    for first in range(0, tile_count, CHUNK_BATCH):
+        tiles = np.arange(first, min(first + CHUNK_BATCH, tile_count))
+        cells = rng.random((len(tiles), TILE, TILE, TILE, TILE), dtype=np.float32) < wall_percentage
+        packed = np.packbits(cells, axis=-1, bitorder='little')[..., 0]
+        coords = np.stack(np.unravel_index(tiles, (n,) * 4), axis=1)
+        walls[tiles] = packed | ~in_bounds_bits(size, coords)  # Cells past the edge are walls
+
+    for pos in (start, goal):
+        tile, local, bit = locate(size, pos)
+        walls[(tile,) + local] &= 0xFF ^ bit
+
+    return {
+        "start": start,
+        "goal": goal,
+        "size": size,
+        "difficulty": str(int(wall_percentage * 100)) + "%",
+        "grid": ChunkedGrid.from_tile_walls(size, walls)
+    }
+
+
+MAZE_ALGORITHMS = ('dfs', 'kruskal', 'prim')
+GENERATOR_ALGORITHMS = ('random',) + MAZE_ALGORITHMS
+
+
+class MazeLattice:
+    """
+    The cells of a maze level that are corridor junctions ("nodes"): those
+    with every coordinate even. Nodes are numbered like a flat
+    (nodes, nodes, nodes, nodes) array, and edge `node * 4 + dim` joins a
+    node to its neighbour one node further along `dim`.
+    """
+
+    def __init__(self, size):
+        self.nodes = (size + 1) // 2
+        self.count = self.nodes ** 4
+        self.strides = (self.nodes ** 3, self.nodes ** 2, self.nodes, 1)
+        self.coords = [c.tolist() for c in np.unravel_index(np.arange(self.count), (self.nodes,) * 4)]
+
+    def edges(self, node):
+        """(neighbour, edge) pairs of a node."""
+        pairs = []
+        for dim, stride in enumerate(self.strides):
+            c = self.coords[dim][node]
+            if c + 1 < self.nodes:
+                pairs.append((node + stride, node * 4 + dim))
+            if c > 0:
+                pairs.append((node - stride, (node - stride) * 4 + dim))
+        return pairs
+
+    def ends(self, edge):
+        node, dim = divmod(edge, 4)
+        return node, node + self.strides[dim]
+
+
+def _maze_dfs(lattice, rand):
+    """Randomized depth-first search with an explicit stack."""
+    visited = bytearray(lattice.count)
+    visited[0] = 1
+    stack = [0]
+    carved = []
+    while stack:
+        options = [(nxt, edge) for nxt, edge in lattice.edges(stack[-1]) if not visited[nxt]]
+        if not options:
+            stack.pop()
+            continue
+        nxt, edge = options[rand.randrange(len(options))]
+        visited[nxt] = 1
+        carved.append(edge)
+        stack.append(nxt)
+    return carved
+
+
+def _maze_kruskal(lattice, rand):
+    """Randomized Kruskal: shuffled edges joined by a union-find with path halving."""
+    edges = [node * 4 + dim for node in range(lattice.count) for dim in range(4)
+             if lattice.coords[dim][node] + 1 < lattice.nodes]
+    rand.shuffle(edges)
+    parent = list(range(lattice.count))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    carved = []
+    for edge in edges:
+        a, b = (find(node) for node in lattice.ends(edge))
+        if a != b:
+            parent[a] = b
+            carved.append(edge)
+    return carved
+
+
+def _maze_prim(lattice, rand):
+    """Randomized Prim: grow the tree through a random frontier edge at a time."""
+    in_tree = bytearray(lattice.count)
+    in_tree[0] = 1
+    frontier = [edge for _, edge in lattice.edges(0)]
+    carved = []
+    while frontier:
+        i = rand.randrange(len(frontier))
+        frontier[i], frontier[-1] = frontier[-1], frontier[i]
+        edge = frontier.pop()
+        a, b = lattice.ends(edge)
+        if in_tree[a] and in_tree[b]:
+            continue
+        node = b if in_tree[a] else a
+        in_tree[node] = 1
+        carved.append(edge)
+        frontier.extend(edge for nxt, edge in lattice.edges(node) if not in_tree[nxt])
+    return carved
+
+
+MAZE_CARVERS = {
+    'dfs': _maze_dfs,
+    'kruskal': _maze_kruskal,
+    'prim': _maze_prim
+}
+
+
+def _braid(lattice, carved, braid, rand):
+    """Open an extra passage out of a `braid` share of the dead ends, adding loops."""
+    open_edges = set(carved)
+    degree = [0] * lattice.count
+    for edge in carved:
+        for node in lattice.ends(edge):
+            degree[node] += 1
+    dead_ends = [node for node in range(lattice.count) if degree[node] == 1]
+    rand.shuffle(dead_ends)
+    for node in dead_ends:
+        if degree[node] != 1 or rand.random() >= braid:
+            continue  # Already joined by an earlier passage, or kept
+        options = [(nxt, edge) for nxt, edge in lattice.edges(node) if edge not in open_edges]
+        # Joining two dead ends removes both
+        paired = [option for option in options if degree[option[0]] == 1]
+        nxt, edge = rand.choice(paired or options)
+        open_edges.add(edge)
+        carved.append(edge)
+        degree[node] += 1
+        degree[nxt] += 1
+    return carved
+
+
+def generate_maze_level(size, algorithm='dfs', braid=0.0, rng=None):
+    """
+    Generate a corridor maze that is always solvable.
+    Nodes (cells with all coordinates even) are joined into a random
+    spanning tree by `algorithm` (see MAZE_CARVERS), carving the cell
+    between each joined pair. braid: share (0-1) of dead ends that get an
+    extra passage, turning the tree into a maze with loops.
+    With an even size the last layer along each axis stays wall.
+    """
+    if size < 3:
+        raise ValueError(f"Maze levels need a size of at least 3, got {size}")
+    if algorithm not in MAZE_CARVERS:
+        raise ValueError(f"Unknown maze algorithm {algorithm!r}, expected one of {', '.join(MAZE_CARVERS)}")
+    if rng is None:
+        rng = np.random.default_rng()
+    rand = random.Random(int(rng.integers(2 ** 63)))  # Per-step choices are cheaper on random.Random
+
+    lattice = MazeLattice(size)
+    carved = MAZE_CARVERS[algorithm](lattice, rand)
+    if braid > 0:
+        carved = _braid(lattice, carved, braid, rand)
+
+    grid = LevelGrid(size, np.ones((size,) * 4, dtype=bool))
+    grid.cells[::2, ::2, ::2, ::2] = False
+    edges = np.array(carved, dtype=np.int64)
+    passages = 2 * np.stack(np.unravel_index(edges // 4, (lattice.nodes,) * 4), axis=1)
+    passages[np.arange(len(edges)), edges % 4] += 1
+    grid.cells[tuple(passages.T)] = False
+
+    start = [0, 0, 0, 0]
+    max_node = lattice.nodes - 1
+    goal = [2 * int(c) for c in rng.integers(max_node // 2, max_node, size=4, endpoint=True)]
+    return {
+        "start": start,
+        "goal": goal,
+        "size": size,
+        "difficulty": f"{algorithm} {int(grid.wall_count / grid.cell_count * 100)}%",
+        "grid": grid
+    }
+
+
+def generate_seeded_level(params, seed):
+    """
+    Build a level from a seed and generator parameters (algorithm, size,
+    wall_percentage, braid, repair). For a given SEED_GENERATOR_VERSION the
+    same inputs always give the same level, so seed files (see
+    seed_levels) can store them instead of the walls.
+    """
+    generate = level_factory('json', params['algorithm'], params.get('braid', 0.0))
+    level_data = generate(params.get('wall_percentage', 0.5), params['size'], np.random.default_rng(seed))
+    if params.get('repair'):
+        repair_level(level_data)
+    level_data['procedural'] = {"version": SEED_GENERATOR_VERSION, "seed": seed, "params": dict(params)}
+    return level_data
+
+
+def level_factory(file_format='json', algorithm='random', braid=0.0, repair=False):
+    """The generator for a format and algorithm, as fn(wall_percentage, size, rng)."""
+    if file_format == 'seed':
+        # Draw a fresh seed per level so each one can be rebuilt on its own
+        def generate_seeded(wall_percentage, size, rng):
+            params = {"algorithm": algorithm, "size": size, "wall_percentage": wall_percentage,
+                      "braid": braid, "repair": repair}
+            return generate_seeded_level(params, int(rng.integers(2 ** 63)))
+        return generate_seeded
+    if algorithm != 'random':
+        return lambda wall_percentage, size, rng: generate_maze_level(size, algorithm, braid, rng)
+    return generate_chunked_level if file_format == 'chunked' else generate_level
+
+
+def level_filepath(level_number, file_format='json'):
+    return f"levels/{level_number}{FILE_EXTENSIONS[file_format]}"
+
+
+def save_level(level_data, level_number, file_format='json'):
+    """
+    Save level data to a level file of the given format. The file is
+    written in a hidden scratch directory and renamed into place, so the
+    menu and level index never see a partly written level.
+    """
     Path("levels").mkdir(exist_ok=True)
-    
-    filepath = f"levels/{level_number}.json"
-    with open(filepath, 'w') as f:
-        json.dump(level_data, f, indent=4, sort_keys=True)
-    
+
+    filepath = level_filepath(level_number, file_format)
+    scratch = tempfile.mkdtemp(dir="levels", prefix=".saving-")
+    try:
+        temp = os.path.join(scratch, os.path.basename(filepath))  # Same extension picks the same writer
+        level_format.save_level(level_data, temp)
+        os.chmod(temp, LEVEL_FILE_MODE)
+        os.replace(temp, filepath)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
     return filepath
 
 
-def GenerateLevel(wall_percentage, size, level_id):
+def level_lock_path(level_id):
+    return Path("levels", f"level_{level_id}.lock")
 
-    print(f"Generating level with difficulty {wall_percentage} and size {size}...")
 
-    level_data = generate_level(wall_percentage, size)
+def level_id_taken(level_id):
+    return any(Path("levels", f"{level_id}{extension}").exists() for extension in FILE_EXTENSIONS.values())
 
-    print(f"Level generated successfully! Verifying Solvability...")
-    
-    # Get solvability info for display
-    solvable, min_steps, solution_path = verify_level(level_data)
-    
-    if solvable:
-        print(f"Minimum steps required: {min_steps}")
-        filepath = save_level(level_data, level_id)
-        print(f"Level saved to {filepath}")
+
+def ReserveLevelId(level_id):
+    """
+    Claim the first free level id >= level_id, in every format, by creating
+    its lock file with O_EXCL, so concurrent generators never hand out the
+    same id. Release it with ReleaseLevelId once the level is saved.
+    """
+    Path("levels").mkdir(exist_ok=True)
+    while True:
+        if not level_id_taken(level_id):
+            try:
+                fd = os.open(level_lock_path(level_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY, LEVEL_FILE_MODE)
+                os.close(fd)
+            except FileExistsError:
+                pass
+            else:
+                # Another generator may have saved this id and dropped its lock in between
+                if not level_id_taken(level_id):
+                    return level_id
+                ReleaseLevelId(level_id)
+        level_id += 1
+
+
+def ReleaseLevelId(level_id):
+    level_lock_path(level_id).unlink(missing_ok=True)
+
+
+def repair_candidate(level_data, result, solver):
+    """
+    Join the start and goal components of an unsolvable dense level by
+    opening the fewest walls, and solve it again. Chunked levels are left
+    as they are. Returns (solve result, walls opened).
+    """
+    if result.solvable or isinstance(level_data['grid'], ChunkedGrid):
+        return result, 0
+    opened = repair_level(level_data)
+    return solve_level(level_data, solver), opened
+
+
+def GenerateLevel(wall_percentage, size, level_id, file_format='json', solver='bidirectional',
+                  seed=None, max_attempts=DEFAULT_MAX_ATTEMPTS, repair=False, algorithm='random', braid=0.0):
+
+    if algorithm == 'random':
+        print(f"Generating level with difficulty {wall_percentage} and size {size}...")
     else:
-        print("Level is not solvable, generating again...")
-        GenerateLevel(wall_percentage, size, level_id)
+        print(f"Generating {algorithm} maze with braid {braid} and size {size}...")
+
+    rng = np.random.default_rng(seed)
+    began = time.perf_counter()
+
+    generate = level_factory(file_format, algorithm, braid, repair)
+    for attempt in range(1, max_attempts + 1):
+        level_data = generate(wall_percentage, size, rng)
+
+        # Get solvability info for display
+        result = solve_level(level_data, solver)
+        if repair:
+            result, opened = repair_candidate(level_data, result, solver)
+            if opened:
+                print(f"Attempt {attempt}: opened {opened} wall(s) to join the start and goal")
+
+        if result.solvable:
+            print(f"Level generated in {attempt} attempt(s), {time.perf_counter() - began:.2f} s")
+            print_stats(result)
+            print(f"Minimum steps required: {result.steps}")
+            level_data['optimal_steps'] = result.steps  # Kept by seed files for the menu
+            filepath = save_level(level_data, level_id, file_format)
+            store_solution(level_data, result)  # solve.py and the menu need not search again
+            print(f"Level saved to {filepath}")
+            return level_data
+
+        print(f"Attempt {attempt}: level is not solvable, generating again...")
+
+    print(f"Gave up after {max_attempts} attempts ({time.perf_counter() - began:.2f} s), "
+          f"try a lower wall percentage")
+    return None
+
+
+def GenerateCandidate(wall_percentage, size, solver, seed, file_format='json', repair=False,
+                      algorithm='random', braid=0.0):
+    """Generate and solve one level in a worker; returns (level_data, result, seconds)."""
+    began = time.perf_counter()
+    generate = level_factory(file_format, algorithm, braid, repair)
+    level_data = generate(wall_percentage, size, np.random.default_rng(seed))
+    result = solve_level(level_data, solver)
+    if repair:
+        result, _ = repair_candidate(level_data, result, solver)
+    return level_data, result, time.perf_counter() - began
+
+
+def GenerateLevelPack(count, wall_percentage, size, level_id, workers=None, min_steps=0, max_steps=None,
+                      file_format='json', solver='bidirectional', seed=None,
+                      max_attempts=DEFAULT_MAX_ATTEMPTS, repair=False, algorithm='random', braid=0.0):
+    """
+    Generate `count` solvable levels whose shortest path lies within
+    [min_steps, max_steps], generating and solving candidates in a process
+    pool and saving accepted ones under sequential ids from `level_id`.
+    """
+    print(f"Generating {count} levels with difficulty {wall_percentage} and size {size} "
+          f"({workers or os.cpu_count()} workers)...")
+
+    seeds = np.random.SeedSequence(seed)
+    budget = count * max_attempts
+    in_flight = 2 * (workers or os.cpu_count())
+    began = time.perf_counter()
+    candidates = 0
+    saved = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        submitted = 0
+        while len(saved) < count:
+            while len(pending) < in_flight and submitted < budget:
+                pending.add(executor.submit(GenerateCandidate, wall_percentage, size, solver,
+                                            seeds.spawn(1)[0], file_format, repair, algorithm, braid))
+                submitted += 1
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                level_data, result, seconds = future.result()
+                candidates += 1
+                if not result.solvable:
+                    continue
+                if result.steps < min_steps or (max_steps is not None and result.steps > max_steps):
+                    continue
+                if len(saved) == count:
+                    continue
+
+                level_id = ReserveLevelId(level_id)
+                level_data['optimal_steps'] = result.steps
+                try:
+                    filepath = save_level(level_data, level_id, file_format)
+                finally:
+                    ReleaseLevelId(level_id)
+                store_solution(level_data, result)
+                saved.append(filepath)
+                print(f"✓ {filepath}: {result.steps} steps, {result.nodes_expanded} nodes expanded, "
+                      f"generated in {seconds * 1000:.1f} ms")
+                level_id += 1
+
+        for future in pending:
+            future.cancel()
+
+    elapsed = time.perf_counter() - began
+    print(f"\nSaved {len(saved)}/{count} levels from {candidates} candidates in {elapsed:.2f} s "
+          f"({len(saved) / elapsed:.2f} levels/s, {candidates / elapsed:.2f} candidates/s)")
+    if len(saved) < count:
+        print(f"Attempt budget of {budget} candidates exhausted, try widening the step band")
+    return saved
 
 
 def GetNextLevelId():
-    levels = [int(lvl.split('.')[0]) for lvl in os.listdir('levels')]
-    levels.sort(key=lambda x: int(x))
-    return max(levels) + 1
+    Path("levels").mkdir(exist_ok=True)
+    levels = [int(lvl.split('.')[0]) for lvl in os.listdir('levels') if lvl.split('.')[0].isdigit()]
+    return max(levels, default=0) + 1
 
 # Update the main block to include verification
 if __name__ == "__main__":
@@ -104,11 +504,53 @@ if __name__ == "__main__":
                         help='Size of the level dimensions (default: 5)')
     parser.add_argument('--level_id', type=int,
                        help='Level number to generate (default: auto-increment)')
+    parser.add_argument('--format', choices=list(FILE_EXTENSIONS), default='json',
+                        help='Level file format; chunked is for very large sizes, seed stores only the '
+                             'seed and parameters and rebuilds the walls when opened (default: json)')
+    parser.add_argument('--solver', choices=list(ALGORITHMS), default='bidirectional',
+                        help='Search strategy used to verify solvability (default: bidirectional)')
+    parser.add_argument('--seed', type=int,
+                        help='Random seed for reproducible levels (default: random)')
+    parser.add_argument('--max_attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f'Unsolvable levels to discard before giving up (default: {DEFAULT_MAX_ATTEMPTS})')
+    parser.add_argument('--count', type=int,
+                        help='Generate a pack of this many levels (default: a single level)')
+    parser.add_argument('--workers', type=int,
+                        help='Worker processes for pack generation (default: CPU count)')
+    parser.add_argument('--min_steps', '--min-steps', type=int, default=0,
+                        help='Reject pack levels with a shorter solution (default: 0)')
+    parser.add_argument('--max_steps', '--max-steps', type=int,
+                        help='Reject pack levels with a longer solution (default: no limit)')
+    parser.add_argument('--repair', action='store_true',
+                        help='Open the fewest walls joining start and goal instead of discarding '
+                             'unsolvable levels (not for chunked levels)')
+    parser.add_argument('--algorithm', choices=GENERATOR_ALGORITHMS, default='random',
+                        help='random: independent walls at --wall_percentage; dfs, kruskal, prim: '
+                             'always-solvable corridor mazes (default: random)')
+    parser.add_argument('--braid', type=float, default=0.0,
+                        help='Share of maze dead ends (0-1) opened into loops (default: 0)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not record the solutions of saved levels in the solution cache')
     args = parser.parse_args()
+    solutions.enabled = not args.no_cache
+    if args.algorithm != 'random' and args.size < 3:
+        parser.error("maze algorithms need --size 3 or more")
+    if args.format == 'seed' and args.size > 40:
+        parser.error("seed levels are rebuilt as dense grids; use --format chunked for sizes over 40")
 
     # Use the default values from argparse instead of manual checks
     level_id = args.level_id if args.level_id is not None else GetNextLevelId()
     wall_percentage = args.wall_percentage
     size = args.size
 
-    GenerateLevel(wall_percentage, size, level_id)
\ No newline at end of file
+    if args.count is not None:
+        saved = GenerateLevelPack(args.count, wall_percentage, size, level_id, args.workers,
+                                  args.min_steps, args.max_steps, args.format, args.solver,
+                                  args.seed, args.max_attempts, args.repair, args.algorithm, args.braid)
+        if len(saved) < args.count:
+            sys.exit(1)
+    else:
+        level_data = GenerateLevel(wall_percentage, size, level_id, args.format, args.solver,
+                                   args.seed, args.max_attempts, args.repair, args.algorithm, args.braid)
+        if level_data is None:
+            sys.exit(1)
\ No newline at end of file
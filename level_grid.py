@@ -0,0 +1,114 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Navigation planes shared by the game, solvers and generators.
+PLANES = {
+    'XY': {'dims': (0, 1), 'fixed': (2, 3)},  # dims = moving dims, fixed = static dims
+    'XZ': {'dims': (0, 2), 'fixed': (1, 3)},
+    'XT': {'dims': (0, 3), 'fixed': (1, 2)},
+    'YZ': {'dims': (1, 2), 'fixed': (0, 3)},
+    'YT': {'dims': (1, 3), 'fixed': (0, 2)},
+    'ZT': {'dims': (2, 3), 'fixed': (0, 1)}
+}
+
+# Unit steps along each of the 4 axes: (+X, -X, +Y, -Y, +Z, -Z, +T, -T)
+DIRECTIONS = tuple((dim, delta) for dim in range(4) for delta in (1, -1))
+
+
+class LevelGrid:
+    """
+    Dense 4D occupancy grid of a level.
+    `cells[x, y, z, t]` is True where there is a wall, so wall checks are a
+    single array read instead of a scan over the wall list.
+    """
+
+    def __init__(self, size: int, cells: Optional[np.ndarray] = None):
+        self.size = size
+        if cells is None:
+            cells = np.zeros((size,) * 4, dtype=bool)
+        if cells.shape != (size,) * 4:
+            raise ValueError(f"Grid shape {cells.shape} does not match size {size}")
+        self.cells = cells
+
+    @classmethod
+    def from_walls(cls, size: int, walls: Iterable[Sequence[int]]) -> 'LevelGrid':
+        """Build a grid from a list of [x, y, z, t] wall positions."""
+        grid = cls(size)
+        wall_array = np.asarray(list(walls), dtype=np.intp).reshape(-1, 4)
+        if len(wall_array):
+            grid.cells[tuple(wall_array.T)] = True
+        return grid
+
+    @classmethod
+    def from_level_data(cls, level_data: Dict) -> 'LevelGrid':
+        """Build a grid from a level dict, reusing it if already attached."""
+        grid = level_data.get('grid')
+        if isinstance(grid, cls):
+            return grid
+        return cls.from_walls(level_data['size'], level_data['walls'])
+
+    @property
+    def shape(self) -> Tuple[int, int, int, int]:
+        return self.cells.shape
+
+    @property
+    def cell_count(self) -> int:
+        return self.cells.size
+
+    @property
+    def wall_count(self) -> int:
+        return int(np.count_nonzero(self.cells))
+
+    def in_bounds(self, pos: Sequence[int]) -> bool:
+        """Check if a position lies inside the grid."""
+        return all(0 <= p < self.size for p in pos)
+
+    def is_wall(self, pos: Sequence[int]) -> bool:
+        """Check if an in-bounds position is a wall."""
+        return bool(self.cells[tuple(pos)])
+
+    def is_open(self, pos: Sequence[int]) -> bool:
+        """Check if a position is within bounds and not a wall."""
+        return self.in_bounds(pos) and not self.cells[tuple(pos)]
+
+    def neighbors(self, pos: Sequence[int], dims: Sequence[int] = (0, 1, 2, 3)) -> List[List[int]]:
+        """Get the open neighbours of a position, moving one step along `dims`."""
+        neighbors = []
+        for dim in dims:
+            for delta in (1, -1):
+                coord = pos[dim] + delta
+                if 0 <= coord < self.size:
+                    new_pos = list(pos)
+                    new_pos[dim] = coord
+                    if not self.cells[tuple(new_pos)]:
+                        neighbors.append(new_pos)
+        return neighbors
+
+    def plane_slice(self, plane: str, pos: Sequence[int]) -> np.ndarray:
+        """
+        Return a 2D view of the plane through `pos`.
+        Axis 0 runs along the plane's first moving dimension, axis 1 along
+        the second. The view shares memory with the grid.
+        """
+        index = [slice(None)] * 4
+        for dim in PLANES[plane]['fixed']:
+            index[dim] = pos[dim]
+        return self.cells[tuple(index)]
+
+    def flat_index(self, pos: Sequence[int]) -> int:
+        """Convert a 4D position to an index into `cells.ravel()`."""
+        x, y, z, t = pos
+        return ((x * self.size + y) * self.size + z) * self.size + t
+
+    def position(self, index: int) -> List[int]:
+        """Convert a flat index back to a 4D position."""
+        return [int(c) for c in np.unravel_index(index, self.shape)]
+
+    def walls(self) -> List[List[int]]:
+        """Return the walls as a sorted list of [x, y, z, t] positions."""
+        return np.argwhere(self.cells).tolist()
+
+    def copy(self) -> 'LevelGrid':
+        return LevelGrid(self.size, self.cells.copy())
@@ -0,0 +1,124 @@
+"""
+Persistent index of level metadata.
+
+The menu only needs a few facts per level (size, difficulty, wall count,
+optimal steps), but getting them from the level files means parsing
+megabytes of JSON. The index keeps those facts in one small JSON file,
+keyed by level file and validated against each file's mtime and byte
+size, so a level is only re-read and re-solved after it changes.
+"""
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Union
+
+from level_format import is_seed_level, list_level_files, load_level, natural_sort_key, read_level_info
+from solve import cached_solve
+from solution_cache import solutions
+
+LEVEL_INDEX_FILE = '.level_index.json'
+INDEX_VERSION = 1
+
+
+def file_hash(filename: Union[str, Path]) -> str:
+    """SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def describe_level(level_file: Path) -> Dict:
+    """Load and solve one level file to build its index entry."""
+    if is_seed_level(level_file):
+        # Seed files carry what the menu needs, so listing never rebuilds walls
+        info = read_level_info(level_file)
+        return {
+            "size": info['size'],
+            "difficulty": info['difficulty'],
+            "wall_count": info['wall_count'],
+            "optimal_steps": info.get('optimal_steps')
+        }
+    level_data = load_level(level_file)
+    solution, _ = cached_solve(level_data, 'astar', count_reachable=False)
+    return {
+        "size": level_data['size'],
+        "difficulty": level_data['difficulty'],
+        "wall_count": level_data['grid'].wall_count,
+        "optimal_steps": solution.steps if solution.solvable else None
+    }
+
+
+class LevelIndex:
+    """Level metadata for every file in a levels directory."""
+
+    def __init__(self, levels_path: Union[str, Path] = "levels",
+                 index_file: Union[str, Path] = LEVEL_INDEX_FILE):
+        self.levels_path = Path(levels_path)
+        self.index_file = Path(index_file)
+        self.entries = self.load()
+
+    def load(self) -> Dict[str, Dict]:
+        """Read the saved index, or start empty if missing or outdated."""
+        try:
+            with open(self.index_file, 'r') as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if index.get("version") != INDEX_VERSION:
+            return {}
+        return index.get("levels", {})
+
+    def save(self):
+        with open(self.index_file, 'w') as f:
+            json.dump({"version": INDEX_VERSION, "levels": self.entries}, f, indent=4)
+
+    def refresh(self) -> List[Dict]:
+        """
+        Bring the index up to date with the levels directory and return
+        the entries in natural level order. Files whose mtime and byte size
+        are unchanged are not opened.
+        """
+        changed = False
+        current = {}
+        for level_file in list_level_files(self.levels_path):
+            key = str(level_file)
+            stat = level_file.stat()
+            entry = self.entries.get(key)
+            if entry is None or entry['mtime'] != stat.st_mtime or entry['bytes'] != stat.st_size:
+                digest = file_hash(level_file)
+                if entry is None or entry['hash'] != digest:
+                    entry = describe_level(level_file)
+                entry.update(file=key, level_id=level_file.stem, mtime=stat.st_mtime,
+                             bytes=stat.st_size, hash=digest)
+                changed = True
+            current[key] = entry
+
+        if changed or current.keys() != self.entries.keys():
+            self.entries = current
+            self.save()
+        return sorted(self.entries.values(), key=lambda entry: natural_sort_key(entry['file']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and show the level metadata index')
+    parser.add_argument('--levels', type=Path, default=Path("levels"),
+                        help='Levels directory (default: levels)')
+    parser.add_argument('--rebuild', action='store_true', help='Discard the saved index first')
+    parser.add_argument('--no-cache', action='store_true', help='Solve levels without the solution cache')
+    args = parser.parse_args()
+    solutions.enabled = not args.no_cache
+
+    index = LevelIndex(args.levels)
+    if args.rebuild:
+        index.entries = {}
+    for entry in index.refresh():
+        steps = entry['optimal_steps'] if entry['optimal_steps'] is not None else 'unsolvable'
+        print(f"{entry['level_id']:>6}  size {entry['size']:>3}  difficulty {str(entry['difficulty']):>4}  "
+              f"walls {entry['wall_count']:>8}  optimal steps {steps}")
+
+
+if __name__ == "__main__":
+    main()
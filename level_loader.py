@@ -0,0 +1,152 @@
+"""
+Background level loading.
+
+Reading and parsing a large level can take long enough to freeze the
+window, so the game hands loads to a small thread pool. Each request is a
+LoadJob whose stage and progress the UI can poll, and which can be
+cancelled. Finished jobs stay in a small LRU so a prefetched level (for
+example the one under the mouse in the menu) opens instantly. Only the
+latest prefetch is kept queued: hovering over another level drops the
+previous one if it has not started and nobody is waiting for it, so
+stale prefetches never delay the level actually opened.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import level_format
+from profiler import profiler
+
+
+class LoadCancelled(Exception):
+    """Raised inside a worker when its job has been cancelled."""
+
+
+class LoadJob:
+    """One level load: its progress, and its result once finished."""
+
+    def __init__(self, filename: Path):
+        self.filename = filename
+        self.stage = "Queued"
+        self.progress = 0.0
+        self.level_data = None
+        self.error = None
+        self.done = threading.Event()
+        self.cancelled = threading.Event()
+        self.callbacks = []
+        self.future = None  # The worker task, once queued
+
+    @property
+    def ok(self) -> bool:
+        return self.done.is_set() and self.error is None and not self.cancelled.is_set()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def report(self, stage: str, progress: float):
+        """Progress callback for level_format.load_level; aborts cancelled jobs."""
+        if self.cancelled.is_set():
+            raise LoadCancelled(self.filename)
+        self.stage = stage
+        self.progress = progress
+
+
+class LevelLoader:
+    """Loads level files on worker threads and keeps the most recent ones."""
+
+    def __init__(self, workers: int = 2, capacity: int = 4):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="level-loader")
+        self.capacity = capacity
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.prefetched = None  # Latest prefetch job nobody has requested yet
+
+    def request(self, filename: Union[str, Path],
+                on_done: Optional[Callable[[LoadJob], None]] = None) -> LoadJob:
+        """
+        Start loading a level (or reuse a pending or finished load of it).
+        `on_done(job)` runs on the worker thread when the job finishes, or
+        right away if it already has.
+        """
+        filename = Path(filename)
+        with self.lock:
+            job = self.jobs.get(filename)
+            if job is None or job.cancelled.is_set() or job.error is not None:
+                job = LoadJob(filename)
+                self.jobs[filename] = job
+                job.future = self.executor.submit(self._run, job)
+            self.jobs.move_to_end(filename)
+            self._evict()
+            if on_done is not None:
+                if self.prefetched is job:
+                    self.prefetched = None  # Wanted now, no longer droppable
+                if job.done.is_set():
+                    ready = True
+                else:
+                    job.callbacks.append(on_done)
+                    ready = False
+        if on_done is not None and ready:
+            on_done(job)
+        return job
+
+    def prefetch(self, filename: Union[str, Path]) -> LoadJob:
+        """
+        Load a level in the background without waiting for it, dropping the
+        previous prefetch of another level if it is still queued.
+        """
+        filename = Path(filename)
+        with self.lock:
+            previous = self.prefetched
+            if (previous is not None and previous.filename != filename and not previous.callbacks
+                    and previous.future.cancel()):
+                previous.cancel()
+                previous.done.set()
+                if self.jobs.get(previous.filename) is previous:
+                    del self.jobs[previous.filename]
+        job = self.request(filename)
+        with self.lock:
+            self.prefetched = job if not job.done.is_set() else None
+        return job
+
+    def submit(self, fn: Callable, *args, on_done: Optional[Callable[[Future], None]] = None) -> Future:
+        """Run another background task (such as hint precomputation) on the loader's threads."""
+        future = self.executor.submit(fn, *args)
+        if on_done is not None:
+            future.add_done_callback(on_done)
+        return future
+
+    def cancel(self, job: LoadJob):
+        """Cancel a job and forget it, so a later request starts afresh."""
+        job.cancel()
+        with self.lock:
+            if self.jobs.get(job.filename) is job:
+                del self.jobs[job.filename]
+
+    def shutdown(self):
+        with self.lock:
+            for job in self.jobs.values():
+                job.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _evict(self):
+        # Drop the oldest finished jobs beyond capacity; pending ones stay
+        finished = [name for name, job in self.jobs.items() if job.done.is_set()]
+        while len(self.jobs) > self.capacity and finished:
+            del self.jobs[finished.pop(0)]
+
+    def _run(self, job: LoadJob):
+        try:
+            job.report("Loading", 0.0)
+            with profiler.span("load_level"):
+                job.level_data = level_format.load_level(job.filename, job.report)
+        except LoadCancelled:
+            pass
+        except Exception as error:  # Surfaced to the UI through job.error
+            job.error = error
+        with self.lock:
+            job.done.set()
+            callbacks, job.callbacks = job.callbacks, []
+        for callback in callbacks:
+            callback(job)
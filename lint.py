@@ -0,0 +1,262 @@
+"""
+Level lint: connected components, dead ends and corridors of 4D levels.
+
+label_components labels the open cells of a grid with one flood fill per
+component over a padded flat copy of the mask (as in solve.FlatGraph), so
+every cell is visited once however long the corridors of a maze are. The
+result is one label per 4D-connected component (the player can switch
+planes, so all eight directions connect).
+"""
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from chunked_grid import ChunkedGrid
+from level_grid import LevelGrid
+from level_format import find_level_file, load_level, list_level_files, natural_sort_key
+from solve import FlatGraph
+
+MIN_REACHABLE = 0.8  # Warn when the player can reach less of the level than this
+POCKET_SHARE = 0.05  # Warn about sealed pockets holding more of the open cells than this
+CORRIDOR_COUNT = 3  # Longest corridors listed per level
+
+
+class Components(NamedTuple):
+    """Connected components of a cell mask."""
+    labels: np.ndarray  # Component id per cell, -1 outside the mask; ids ordered by first cell
+    sizes: np.ndarray  # Cells per component
+
+    @property
+    def count(self) -> int:
+        return len(self.sizes)
+
+
+def _shift_pairs(ndim: int):
+    """(lower, upper) index pairs of neighbouring cells along each axis."""
+    for dim in range(ndim):
+        lower, upper = [slice(None)] * ndim, [slice(None)] * ndim
+        lower[dim], upper[dim] = slice(None, -1), slice(1, None)
+        yield tuple(lower), tuple(upper)
+
+
+def label_components(mask: np.ndarray) -> Components:
+    """Label the 4D-connected components of the True cells of `mask`."""
+    # Pad with a closed border so neighbours are index offsets without bounds checks
+    padded = np.zeros(tuple(extent + 2 for extent in mask.shape), dtype=bool)
+    padded[(slice(1, -1),) * mask.ndim] = mask
+    offsets = tuple(stride // padded.itemsize * delta for stride in padded.strides for delta in (1, -1))
+    unvisited = bytearray(padded.ravel().tobytes())
+    labels = array('i', [-1]) * padded.size
+
+    sizes = []
+    for seed in np.flatnonzero(padded.ravel()).tolist():  # Flat order, so ids follow first cells
+        if not unvisited[seed]:
+            continue
+        component = len(sizes)
+        unvisited[seed] = 0
+        labels[seed] = component
+        stack = [seed]
+        size = 0
+        while stack:
+            current = stack.pop()
+            size += 1
+            for offset in offsets:
+                nxt = current + offset
+                if unvisited[nxt]:
+                    unvisited[nxt] = 0
+                    labels[nxt] = component
+                    stack.append(nxt)
+        sizes.append(size)
+
+    labels = np.frombuffer(labels, dtype=np.int32).reshape(padded.shape)
+    return Components(labels[(slice(1, -1),) * mask.ndim].copy(), np.array(sizes, dtype=np.int64))
+
+
+def open_degree(open_cells: np.ndarray) -> np.ndarray:
+    """Open neighbours of every cell (0-8), as uint8."""
+    degree = np.zeros(open_cells.shape, dtype=np.uint8)
+    for lower, upper in _shift_pairs(open_cells.ndim):
+        degree[lower] += open_cells[upper]
+        degree[upper] += open_cells[lower]
+    return degree
+
+
+class LintReport(NamedTuple):
+    level: str
+    size: int
+    open_cells: int
+    components: int
+    reachable_share: float  # Share of open cells in the start's component
+    goal_reachable: bool
+    pockets: int  # Components the player can never enter
+    largest_pocket: int
+    islands: int  # Single open cells sealed off on every side
+    dead_ends: int  # Reachable open cells with one open neighbour
+    corridors: List[int]  # Longest runs of two-neighbour cells, longest first
+    warnings: List[str]
+
+    @property
+    def ok(self) -> bool:
+        return self.goal_reachable
+
+
+def lint_level(level_data: Dict, level: str = '', min_reachable: float = MIN_REACHABLE) -> LintReport:
+    """Connectivity report of a level with a dense grid."""
+    grid = LevelGrid.from_level_data(level_data)
+    open_cells = ~grid.cells
+    components = label_components(open_cells)
+    start_id = components.labels[tuple(level_data['start'])]
+    goal_id = components.labels[tuple(level_data['goal'])]
+    total = int(np.count_nonzero(open_cells))
+
+    reachable = int(components.sizes[start_id]) if start_id >= 0 else 0
+    pocket_sizes = np.delete(components.sizes, start_id) if start_id >= 0 else components.sizes
+    degree = open_degree(open_cells)
+    # A walled-in start reaches nothing (label -1 would select every wall)
+    in_reach = components.labels == start_id if start_id >= 0 else np.zeros(open_cells.shape, dtype=bool)
+    corridors = label_components(open_cells & (degree == 2)).sizes
+
+    report = LintReport(
+        level=level,
+        size=grid.size,
+        open_cells=total,
+        components=components.count,
+        reachable_share=reachable / total if total else 0.0,
+        goal_reachable=bool(start_id >= 0 and start_id == goal_id),
+        pockets=len(pocket_sizes),
+        largest_pocket=int(pocket_sizes.max(initial=0)),
+        islands=int(np.count_nonzero(pocket_sizes == 1)),
+        dead_ends=int(np.count_nonzero(in_reach & (degree == 1))),
+        corridors=sorted(corridors.tolist(), reverse=True)[:CORRIDOR_COUNT],
+        warnings=[]
+    )
+    if start_id < 0:
+        report.warnings.append("start cell is a wall")
+    if not report.goal_reachable:
+        report.warnings.append("goal is not reachable from the start")
+    if report.reachable_share < min_reachable:
+        report.warnings.append(f"only {report.reachable_share:.0%} of the open cells are reachable")
+    if total and report.largest_pocket > POCKET_SHARE * total:
+        report.warnings.append(f"sealed pocket of {report.largest_pocket} cells "
+                               f"({report.largest_pocket / total:.0%} of the open cells)")
+    return report
+
+
+def bridge_walls(grid: LevelGrid, start: List[int], goal: List[int]) -> Optional[List[List[int]]]:
+    """
+    The fewest walls whose removal connects start to goal, found by a 0-1
+    BFS where open cells cost nothing to enter and walls cost one.
+    Returns [] when they are already connected, or None if start or goal
+    is out of bounds.
+    """
+    graph = FlatGraph(grid)
+    if not (grid.in_bounds(start) and grid.in_bounds(goal)):
+        return None
+    inside = np.zeros((graph.padded_size,) * 4, dtype=bool)
+    inside[1:-1, 1:-1, 1:-1, 1:-1] = True
+    inside = bytearray(inside.ravel().tobytes())
+    open_cells, offsets = graph.open, graph.offsets
+
+    source, target = graph.index(start), graph.index(goal)
+    cost = array('i', [-1]) * graph.cell_count
+    parent = array('i', [-1]) * graph.cell_count
+    cost[source] = 0
+    parent[source] = source
+    queue = deque([source])
+    while queue:
+        current = queue.popleft()
+        if current == target:
+            break
+        for offset in offsets:
+            nxt = current + offset
+            if not inside[nxt]:
+                continue
+            step = 0 if open_cells[nxt] else 1
+            next_cost = cost[current] + step
+            if cost[nxt] < 0 or next_cost < cost[nxt]:
+                cost[nxt] = next_cost
+                parent[nxt] = current
+                if step:
+                    queue.append(nxt)
+                else:
+                    queue.appendleft(nxt)
+
+    return [pos for pos in graph.path(parent, source, target) if grid.is_wall(pos)]
+
+
+def repair_level(level_data: Dict) -> int:
+    """
+    Open the fewest walls needed to join the start's and goal's components,
+    in place. Returns the number of walls opened (0 if already solvable).
+    """
+    grid = LevelGrid.from_level_data(level_data)
+    walls = bridge_walls(grid, level_data['start'], level_data['goal'])
+    if not walls:
+        return 0
+    grid.cells[tuple(np.array(walls).T)] = False
+    level_data['grid'] = grid
+    return len(walls)
+
+
+def print_report(report: LintReport, name: str):
+    mark = "✓" if report.ok else "✗"
+    corridors = ", ".join(str(length) for length in report.corridors) or "none"
+    print(f"{mark} {name}: {report.open_cells} open cells, {report.components} components, "
+          f"{report.reachable_share:.1%} reachable, {report.pockets} sealed pockets "
+          f"(largest {report.largest_pocket}, {report.islands} single cells), "
+          f"{report.dead_ends} dead ends, longest corridors {corridors}")
+    for warning in report.warnings:
+        print(f"    ! {warning}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report connectivity problems in 4D maze levels')
+    parser.add_argument('--level', type=int, help='Level number to lint (default: every level in levels/)')
+    parser.add_argument('--glob', help='Glob of level files to lint')
+    parser.add_argument('--min-reachable', type=float, default=MIN_REACHABLE,
+                        help=f'Warn when less of the open space is reachable (default: {MIN_REACHABLE})')
+    parser.add_argument('--report', type=Path, help='Write the reports to a JSON file')
+    args = parser.parse_args()
+
+    levels_path = Path("levels")
+    if args.level is not None:
+        level_files = [find_level_file(levels_path, args.level)]
+        if not level_files[0].exists():
+            print(f"Error: Level {args.level} does not exist!")
+            sys.exit(1)
+    elif args.glob:
+        level_files = sorted(Path().glob(args.glob), key=natural_sort_key)
+    else:
+        level_files = sorted(list_level_files(levels_path), key=natural_sort_key)
+    if not level_files:
+        print("Error: No levels found!")
+        sys.exit(1)
+
+    reports = []
+    for level_file in level_files:
+        level_data = load_level(level_file)
+        if isinstance(level_data['grid'], ChunkedGrid):
+            print(f"- {level_file}: skipped (chunked level, too large to label)")
+            continue
+        report = lint_level(level_data, level_file.stem, args.min_reachable)
+        print_report(report, str(level_file))
+        reports.append(report)
+
+    failed = sum(not report.ok for report in reports)
+    warned = sum(bool(report.warnings) for report in reports)
+    print(f"\n{len(reports)} levels linted: {failed} unsolvable, {warned} with warnings")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({"levels": [report._asdict() for report in reports]}, f, indent=4)
+        print(f"Report saved to {args.report}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
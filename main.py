@@ -1,12 +1,19 @@
 import pygame
+import argparse
 import sys
-import json
-from typing import List, Tuple
-from datetime import datetime
 from pathlib import Path
-import re  # Add this to the imports at the top
 
-from components.text import ShowGoal, ShowPosition, ShowInstructions
+from components.text import ShowGoal, ShowPosition, ShowInstructions, HudLine, text_cache
+from components.slice_cache import SliceCache
+from components.overview import PlaneOverview
+from level_grid import PLANES
+from game_state import GameState
+import level_format
+from level_index import LevelIndex
+from leaderboard import Leaderboard
+from level_loader import LevelLoader
+from profiler import profiler, WAIT
+from hints import Hint, load_hints
 
 # Initialize Pygame
 pygame.init()
@@ -26,27 +33,34 @@ GOAL_COLOR = (0, 255, 0)  # Green
 BLOCK_SIZE = 50
 GRID_WIDTH = 10
 GRID_HEIGHT = 10
-
-# At the top of the file, add these constants
-PLANES = {
-    'XY': {'dims': (0, 1), 'fixed': (2, 3)},  # dims = moving dims, fixed = static dims
-    'XZ': {'dims': (0, 2), 'fixed': (1, 3)},
-    'XT': {'dims': (0, 3), 'fixed': (1, 2)},
-    'YZ': {'dims': (1, 2), 'fixed': (0, 3)},
-    'YT': {'dims': (1, 3), 'fixed': (0, 2)},
-    'ZT': {'dims': (2, 3), 'fixed': (0, 1)}
-}
+TOP_MARGIN = 100  # Space for text at top
+BOTTOM_MARGIN = 50  # Space for text at bottom
 
 WALL_COLOR = BLACK
 PATH_COLOR = WHITE
 PLAYER_COLOR = RED
+HINT_COLOR = (255, 140, 0)  # Orange outline on the hinted cell
+
+# Overview panel: thumbnails of all six planes, two columns right of the maze
+OVERVIEW_THUMB = 110
+OVERVIEW_GAP = 10
+OVERVIEW_LABEL = 20
+OVERVIEW_BORDER_COLOR = (180, 180, 180)
+OVERVIEW_RECT = pygame.Rect(SCREEN_WIDTH - 2 * OVERVIEW_THUMB - OVERVIEW_GAP - 10, TOP_MARGIN,
+                            2 * OVERVIEW_THUMB + OVERVIEW_GAP, 3 * (OVERVIEW_THUMB + OVERVIEW_LABEL + OVERVIEW_GAP))
 
 # Add after pygame.init()
 font = pygame.font.Font(None, 36)
 small_font = pygame.font.Font(None, 24) # Add a smaller font for instructions
 
+STEPS_LINE = HudLine((SCREEN_WIDTH - 150, 10))
+HINT_LINE = HudLine((10, 70))  # Below the position line
+PROFILE_LINE = HudLine((10, SCREEN_HEIGHT - 30))  # --profile overlay, below the maze
+TRACE_FILE = 'trace.json'
+
 # Add after other constants
-LEADERBOARD_FILE = 'leaderboard.json'
+LEADERBOARD_FILE = 'leaderboard.json'  # Legacy scores, imported into the database once
+LEADERBOARD_DB = 'leaderboard.db'
 
 # Add these color constants after the other color definitions
 DIM_COLORS = {
@@ -61,31 +75,45 @@ MENU_SCROLL_SPEED = 20  # Pixels per scroll
 LEVELS_PER_PAGE = 8
 BUTTON_HEIGHT = 80
 
+# Main loop pacing
+FRAME_RATE = 30  # Frames per second in paced mode
+IDLE_TIMEOUT = 1000  # Longest time (ms) the loop sleeps waiting for input
+
+# Background level loading
+LEVEL_LOADED = pygame.USEREVENT + 1  # Posted by the loader thread when a load finishes
+LOADING_TICK = pygame.USEREVENT + 2  # Repaints the loading screen's progress bar
+LOADING_TICK_MS = 100
+HINTS_READY = pygame.USEREVENT + 3  # Posted when a level's hint field is ready
+HINT_PENDING = Hint('pending', -1)  # Shown while the hint field is computed
+loader = LevelLoader()
+
+# Arrow keys -> (horizontal, vertical) movement within the current plane (see GameState.move)
+MOVE_KEYS = {
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1),
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0)
+}
 
-def load_level(filename: str) -> dict:
-    """Load level data from JSON file."""
-    with open(filename, 'r') as f:
-        return json.load(f)
+# Number keys -> plane to switch to
+PLANE_KEYS = {
+    pygame.K_1: 'XY',
+    pygame.K_2: 'XZ',
+    pygame.K_3: 'XT',
+    pygame.K_4: 'YZ',
+    pygame.K_5: 'YT',
+    pygame.K_6: 'ZT'
+}
 
 
-def is_valid_position(pos: List[int], walls: List[List[int]]) -> bool:
-    """Check if a 4D position is valid (not a wall)."""
-    return tuple(pos) not in set(tuple(wall) for wall in walls)
+def load_level(filename: str) -> dict:
+    """Load level data from a JSON or binary level file."""
+    return level_format.load_level(filename)
 
 
-def initialize_game(level_data):
+def initialize_game(level_data) -> GameState:
     """Initialize game state from level data"""
-    walls = level_data['walls']
-    start_pos = level_data['start']
-    goal_pos = level_data['goal']
-    DIMENSION_SIZE = level_data['size']  # Get size from level data
-    
-    # Initialize MAZE with the correct dimensions from level data
-    MAZE = [[[[0 for t in range(DIMENSION_SIZE)]
-              for z in range(DIMENSION_SIZE)]
-             for y in range(DIMENSION_SIZE)]
-            for x in range(DIMENSION_SIZE)]
-    return walls, start_pos, goal_pos, DIMENSION_SIZE, MAZE
+    return GameState.from_level_data(level_data)  # Grid built once per level
 
 
 # Set up the screen
@@ -96,13 +124,9 @@ pygame.display.set_caption("4D Maze Game")
 clock = pygame.time.Clock()
 
 
-def draw_maze(player_pos, walls, goal_pos, DIMENSION_SIZE, current_plane, steps_taken, show_instructions):
-    """Draw the current 2D plane of the maze."""
-    screen.fill(WHITE)
-    
+def maze_layout(DIMENSION_SIZE):
+    """Block size and top-left corner of the maze for a level size."""
     # Calculate the maximum space available for the maze
-    TOP_MARGIN = 100  # Space for text at top
-    BOTTOM_MARGIN = 50  # Space for text at bottom
     available_height = SCREEN_HEIGHT - TOP_MARGIN - BOTTOM_MARGIN
     available_width = SCREEN_WIDTH - 40  # 20px margin on each side
     
@@ -115,154 +139,209 @@ def draw_maze(player_pos, walls, goal_pos, DIMENSION_SIZE, current_plane, steps_
     # Calculate starting position to center the maze
     start_x = (SCREEN_WIDTH - (BLOCK_SIZE * DIMENSION_SIZE)) // 2
     start_y = TOP_MARGIN
-
-    ShowGoal(font, FONT_COLOR, DIM_COLORS, goal_pos, screen)
-    ShowPosition(font, FONT_COLOR, player_pos, screen, DIM_COLORS, current_plane)
-    
-    
-    # Check win condition
-    if player_pos == goal_pos:
-        win_text = f"YOU WIN! Steps taken: {steps_taken}"
-        win_surface = font.render(win_text, True, (0, 255, 0))
-        text_rect = win_surface.get_rect(center=(SCREEN_WIDTH/2, 50))
-        screen.blit(win_surface, text_rect)
-    
-    moving_dims = PLANES[current_plane]['dims']
-    fixed_dims = PLANES[current_plane]['fixed']
-    
-    # Map dimension indices to XYZT
-    dim_map = {0: 'X', 1: 'Y', 2: 'Z', 3: 'T'}
-    
-    # Get colors for horizontal and vertical borders based on current plane
-    horiz_color = DIM_COLORS[dim_map[moving_dims[0]]]  # First dimension color
-    vert_color = DIM_COLORS[dim_map[moving_dims[1]]]   # Second dimension color
-    
-    # Draw the colored borders
+    return BLOCK_SIZE, start_x, start_y
+
+
+def overview_layout():
+    """Screen rect of each plane's thumbnail in the overview panel."""
+    layout = {}
+    for i, plane in enumerate(PLANES):
+        x = OVERVIEW_RECT.x + (i % 2) * (OVERVIEW_THUMB + OVERVIEW_GAP)
+        y = OVERVIEW_RECT.y + (i // 2) * (OVERVIEW_THUMB + OVERVIEW_LABEL + OVERVIEW_GAP)
+        layout[plane] = pygame.Rect(x, y, OVERVIEW_THUMB, OVERVIEW_THUMB)
+    return layout
+
+
+def invalidate_maze():
+    """Force the next draw_maze call to repaint the whole screen."""
+    draw_maze.last_frame = None
+
+
+def hint_text(hint):
+    """HUD text for a hint (empty when hints are off)."""
+    if hint is None:
+        return ""
+    if hint.kind == 'pending':
+        return "Hint: working it out..."
+    if hint.kind == 'unreachable':
+        return "Hint: the goal can't be reached from here"
+    if hint.kind == 'switch':
+        key = next(pygame.key.name(k) for k, plane in PLANE_KEYS.items() if plane == hint.plane)
+        return f"Hint: switch to {hint.plane} (press {key}), {hint.distance} steps to go"
+    if hint.kind == 'move':
+        return f"Hint: step into the highlighted cell, {hint.distance} steps to go"
+    return ""
+
+
+def draw_maze(player_pos, grid, goal_pos, DIMENSION_SIZE, current_plane, steps_taken, show_instructions,
+              hint=None, show_overview=False):
+    """
+    Draw the current 2D plane of the maze, with an optional hint and an
+    overview panel of all six planes through the player.
+    The slice comes pre-rendered from a SliceCache, and only the screen
+    regions that changed since the last call are redrawn and pushed to the
+    display. Returns the list of updated rects.
+    """
+    BLOCK_SIZE, start_x, start_y = maze_layout(DIMENSION_SIZE)
     border_thickness = 3
-    # Horizontal borders (top and bottom)
-    pygame.draw.rect(screen, horiz_color, 
-        (start_x - border_thickness, 
-         start_y - border_thickness,
-         BLOCK_SIZE * DIMENSION_SIZE + border_thickness * 2,
-         border_thickness))
-    pygame.draw.rect(screen, horiz_color,
-        (start_x - border_thickness,
-         start_y + BLOCK_SIZE * DIMENSION_SIZE,
-         BLOCK_SIZE * DIMENSION_SIZE + border_thickness * 2,
-         border_thickness))
-    
-    # Vertical borders (left and right)
-    pygame.draw.rect(screen, vert_color,
-        (start_x - border_thickness,
-         start_y - border_thickness,
-         border_thickness,
-         BLOCK_SIZE * DIMENSION_SIZE + border_thickness * 2))
-    pygame.draw.rect(screen, vert_color,
-        (start_x + BLOCK_SIZE * DIMENSION_SIZE,
-         start_y - border_thickness,
-         border_thickness,
-         BLOCK_SIZE * DIMENSION_SIZE + border_thickness * 2))
-    
-    # Convert walls to a set for O(1) lookup instead of O(n)
-    wall_set = set(tuple(wall) for wall in walls)
-    
-    # Draw grid
-    for i in range(DIMENSION_SIZE):
-        for j in range(DIMENSION_SIZE):
-            pos = [0, 0, 0, 0]
-            pos[moving_dims[0]] = i
-            pos[moving_dims[1]] = j
-            pos[fixed_dims[0]] = player_pos[fixed_dims[0]]
-            pos[fixed_dims[1]] = player_pos[fixed_dims[1]]
-            
-            # Calculate screen position using new start_x and start_y
-            x = start_x + (i * BLOCK_SIZE)
-            y = start_y + (j * BLOCK_SIZE)
-            
-            # Draw cell
-            if pos == goal_pos:
-                color = GOAL_COLOR
-            else:
-                color = PATH_COLOR if tuple(pos) not in wall_set else WALL_COLOR
-            
-            pygame.draw.rect(screen, color, (x, y, BLOCK_SIZE, BLOCK_SIZE))
-            pygame.draw.rect(screen, BLACK, (x, y, BLOCK_SIZE, BLOCK_SIZE), 1)
-            
-            # Draw player
-            if pos == player_pos:
-                pygame.draw.rect(screen, PLAYER_COLOR, 
-                    (x + BLOCK_SIZE//4, y + BLOCK_SIZE//4, 
-                     BLOCK_SIZE//2, BLOCK_SIZE//2))
-
-    # Add steps counter to the display
-    steps_text = f"Steps: {steps_taken}"
-    steps_surface = font.render(steps_text, True, FONT_COLOR)
-    screen.blit(steps_surface, (SCREEN_WIDTH - 150, 10))
-
-    # Draw instructions popup if requested
-    if show_instructions:
-        ShowInstructions(pygame,SCREEN_WIDTH, SCREEN_HEIGHT, screen, font, FONT_COLOR, WHITE, BLACK, small_font)
-
-    return
-
-
-def move_player(player_pos, steps_taken, direction, current_plane, DIMENSION_SIZE, walls):
-    """Move the player within the current 2D plane."""
-
-    (dh, dv) = direction
+    maze_rect = pygame.Rect(start_x, start_y, BLOCK_SIZE * DIMENSION_SIZE, BLOCK_SIZE * DIMENSION_SIZE)
+    border_rect = maze_rect.inflate(border_thickness * 2, border_thickness * 2)
+
+    cache = getattr(draw_maze, 'slice_cache', None)
+    if cache is None or cache.grid is not grid or cache.block_size != BLOCK_SIZE:
+        cache = draw_maze.slice_cache = SliceCache(grid, goal_pos, PLANES, BLOCK_SIZE,
+                                                   PATH_COLOR, WALL_COLOR, GOAL_COLOR, BLACK)
+        draw_maze.overview = PlaneOverview(grid, goal_pos, PLANES, OVERVIEW_THUMB,
+                                           PATH_COLOR, WALL_COLOR, GOAL_COLOR, PLAYER_COLOR)
+        invalidate_maze()
+
+    last = getattr(draw_maze, 'last_frame', None)
+    frame = {
+        'slice': cache.key(current_plane, player_pos),
+        'hud': (tuple(player_pos), current_plane, steps_taken, hint_text(hint)),
+        'hint_cell': hint.target if hint is not None and hint.kind == 'move' else None,
+        'show_instructions': show_instructions,
+        'show_overview': show_overview
+    }
+    with profiler.span("slice_cache"):
+        slice_surface = cache.get(current_plane, player_pos)
     moving_dims = PLANES[current_plane]['dims']
-    
-    # Apply movement to the correct dimensions based on current plane
-    new_pos = player_pos.copy()
-    new_pos[moving_dims[0]] += dh
-    new_pos[moving_dims[1]] += dv
-    
-    # Check boundaries
-    if all(0 <= new_pos[d] < DIMENSION_SIZE for d in moving_dims):
-        # Check if the new position is valid in the maze
-        if is_valid_position(new_pos, walls):
-            player_pos = new_pos
-            steps_taken += 1  # Increment steps when movement is successful
-    return player_pos, steps_taken
-
 
-def switch_plane(current_plane, new_plane):
-    """Switch to a different 2D plane while maintaining position."""
-    if new_plane in PLANES:
-        current_plane = new_plane
-    return current_plane
+    def cell_rect(pos):
+        x = start_x + pos[moving_dims[0]] * BLOCK_SIZE
+        y = start_y + pos[moving_dims[1]] * BLOCK_SIZE
+        return pygame.Rect(x, y, BLOCK_SIZE, BLOCK_SIZE)
+
+    def draw_player():
+        cell = cell_rect(player_pos)
+        pygame.draw.rect(screen, PLAYER_COLOR, 
+            (cell.x + BLOCK_SIZE//4, cell.y + BLOCK_SIZE//4, 
+             BLOCK_SIZE//2, BLOCK_SIZE//2))
+        return cell
+
+    def draw_hint():
+        if frame['hint_cell'] is None:
+            return None
+        cell = cell_rect(frame['hint_cell'])
+        pygame.draw.rect(screen, HINT_COLOR, cell, max(2, BLOCK_SIZE // 8))
+        return cell
+
+    def draw_hud(force):
+        with profiler.span("draw_hud"):
+            return hud_rects(force)
+
+    def hud_rects(force):
+        # Each HUD line is redrawn only if its text changed (or on a full repaint)
+        rects = [
+            ShowGoal(font, FONT_COLOR, DIM_COLORS, goal_pos, screen, WHITE, force),
+            ShowPosition(font, FONT_COLOR, player_pos, screen, DIM_COLORS, current_plane, WHITE, force),
+            # Add steps counter to the display
+            STEPS_LINE.draw(screen, font, ((f"Steps: {steps_taken}", FONT_COLOR),), WHITE, force),
+            HINT_LINE.draw(screen, font, ((frame['hud'][3], HINT_COLOR),), WHITE, force)
+        ]
+        
+        # Check win condition
+        if player_pos == goal_pos:
+            win_text = f"YOU WIN! Steps taken: {steps_taken}"
+            win_surface = text_cache.render(font, win_text, (0, 255, 0))
+            text_rect = win_surface.get_rect(center=(SCREEN_WIDTH/2, 50))
+            screen.blit(win_surface, text_rect)
+            rects.append(text_rect)
+        return [rect for rect in rects if rect is not None]
+
+    def draw_overview():
+        with profiler.span("draw_overview"):
+            panel = OVERVIEW_RECT.inflate(6, 6)  # Room for the current plane's outline
+            screen.fill(WHITE, panel)
+            for plane, rect in overview_layout().items():
+                thumb_rect = draw_maze.overview.draw(screen, plane, player_pos, rect)
+                if plane == current_plane:
+                    pygame.draw.rect(screen, FONT_COLOR, thumb_rect.inflate(4, 4), 2)
+                else:
+                    pygame.draw.rect(screen, OVERVIEW_BORDER_COLOR, thumb_rect.inflate(2, 2), 1)
+                label = text_cache.render(small_font, plane, FONT_COLOR)
+                screen.blit(label, (rect.x, rect.y + OVERVIEW_THUMB + 3))
+            return panel
+
+    def draw_slice():
+        # Map dimension indices to XYZT
+        dim_map = {0: 'X', 1: 'Y', 2: 'Z', 3: 'T'}
+        
+        # Get colors for horizontal and vertical borders based on current plane
+        horiz_color = DIM_COLORS[dim_map[moving_dims[0]]]  # First dimension color
+        vert_color = DIM_COLORS[dim_map[moving_dims[1]]]   # Second dimension color
+        
+        # Horizontal borders (top and bottom), then vertical borders (left and right)
+        screen.fill(horiz_color, (border_rect.left, border_rect.top, border_rect.width, border_thickness))
+        screen.fill(horiz_color, (border_rect.left, maze_rect.bottom, border_rect.width, border_thickness))
+        screen.fill(vert_color, (border_rect.left, border_rect.top, border_thickness, border_rect.height))
+        screen.fill(vert_color, (maze_rect.right, border_rect.top, border_thickness, border_rect.height))
+
+        screen.blit(slice_surface, maze_rect)
+        draw_hint()
+        draw_player()
+        return border_rect
+
+    changed = last is None or frame != last
+    if (last is None or frame['show_instructions'] != last['show_instructions']
+            or frame['show_overview'] != last['show_overview'] or (show_instructions and changed)):
+        # Full repaint
+        screen.fill(WHITE)
+        draw_hud(force=True)
+        draw_slice()
+        if show_overview:
+            draw_overview()
+        # Draw instructions popup if requested
+        if show_instructions:
+            ShowInstructions(pygame,SCREEN_WIDTH, SCREEN_HEIGHT, screen, font, FONT_COLOR, WHITE, BLACK, small_font)
+        dirty_rects = [screen.get_rect()]
+    else:
+        dirty_rects = []
+        if frame['hud'] != last['hud']:
+            dirty_rects += draw_hud(force=False)
+        if frame['slice'] != last['slice']:
+            dirty_rects.append(draw_slice())
+        elif frame['hud'][0] != last['hud'][0] or frame['hint_cell'] != last['hint_cell']:
+            # Player or hint moved within the slice: restore their old cells, draw the new ones
+            for old_pos in (last['hud'][0], last['hint_cell']):
+                if old_pos is not None:
+                    old_cell = cell_rect(old_pos)
+                    screen.blit(slice_surface, old_cell, old_cell.move(-start_x, -start_y))
+                    dirty_rects.append(old_cell)
+            dirty_rects += [rect for rect in (draw_hint(), draw_player()) if rect is not None]
+        if show_overview and frame['hud'][:2] != last['hud'][:2]:
+            dirty_rects.append(draw_overview())
+
+    draw_maze.last_frame = frame
+    if dirty_rects:
+        with profiler.span("display_update"):
+            pygame.display.update(dirty_rects)
+    return dirty_rects
 
 
 def load_leaderboard():
-    """Load leaderboard from JSON file."""
-    try:
-        with open(LEADERBOARD_FILE, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {"levels": {}}  # Simple levels dictionary
+    """Open the leaderboard database once, importing leaderboard.json on first run."""
+    if getattr(load_leaderboard, 'board', None) is None:
+        load_leaderboard.board = Leaderboard(LEADERBOARD_DB, LEADERBOARD_FILE)
+    return load_leaderboard.board
 
 
-def save_leaderboard(leaderboard):
-    """Save leaderboard to JSON file."""
-    with open(LEADERBOARD_FILE, 'w') as f:
-        json.dump(leaderboard, f, indent=4)
+def best_scores():
+    """Best run of every level for the menu, cached in memory until the next score."""
+    if getattr(best_scores, 'cache', None) is None:
+        best_scores.cache = load_leaderboard().best_per_level()
+    return best_scores.cache
 
 
-def add_score(steps, level_id):
-    """Add new score to leaderboard."""
+def add_score(steps, level_id, moves=None):
+    """Add new score (and the run's move log) to leaderboard."""
 
-    # Load and update leaderboard
     leaderboard = load_leaderboard()
-    if level_id not in leaderboard["levels"]:
-        leaderboard["levels"][level_id] = []
-
-    top5 = leaderboard["levels"][level_id][:5]
-    istop5 = any(steps < score["steps"] for score in top5) or len(top5) < 5
+    name = ""
 
     # Get player name if theyre in the top 5
-    if istop5:
+    if leaderboard.qualifies(level_id, steps):
         pygame.display.set_caption("Enter Your Name")
-        name = ""
         name_entered = False
     
     
@@ -272,7 +351,7 @@ def add_score(steps, level_id):
             screen.blit(text, (SCREEN_WIDTH//4, SCREEN_HEIGHT//2))
             pygame.display.flip()
             
-            for event in pygame.event.get():
+            for event in next_events():
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_RETURN and name:
                         name_entered = True
@@ -281,29 +360,19 @@ def add_score(steps, level_id):
                     elif len(name) < 20 and event.unicode.isprintable():
                         name += event.unicode
     
-        # Add new score
-        leaderboard["levels"][level_id].append({
-            "name": name,
-            "steps": steps,
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
-    
-    # Sort and keep top 5 for this level
-    leaderboard["levels"][level_id].sort(key=lambda x: x["steps"])
-    leaderboard["levels"][level_id] = leaderboard["levels"][level_id][:5]
-    
-    save_leaderboard(leaderboard)
+    # Every run is kept; runs outside the top 5 are recorded without a name
+    with profiler.span("leaderboard_write"):
+        leaderboard.add_run(level_id, name, steps, moves=moves)
+    best_scores.cache = None
     return
 
 
-def reset_game(start_pos):
+def reset_game(state):
     """Reset the game state."""
-    player_pos = start_pos.copy()
-    steps_taken = 0
-    current_plane = 'XY'
+    state.reset()
     show_instructions = False  # Changed to False by default
     score_added = False
-    return player_pos, steps_taken, current_plane, show_instructions, score_added
+    return show_instructions, score_added
 
 
 def show_leaderboard(leaderboard, level_id):
@@ -314,39 +383,34 @@ def show_leaderboard(leaderboard, level_id):
     screen.blit(title, (SCREEN_WIDTH//4, 50))
     
     y = 120
-    if level_id in leaderboard["levels"]:
-        for i, score in enumerate(leaderboard["levels"][level_id], 1):
-            text = f"{i}. {score['name']}: {score['steps']} steps - {score['date']}"
-            score_text = font.render(text, True, BLACK)
-            screen.blit(score_text, (50, y))
-            y += 50
+    for i, score in enumerate(leaderboard.top(level_id, 5), 1):
+        text = f"{i}. {score['name']}: {score['steps']} steps - {score['date']}"
+        score_text = font.render(text, True, BLACK)
+        screen.blit(score_text, (50, y))
+        y += 50
     
     restart_text = font.render("Press SPACE to play again", True, BLACK)
     screen.blit(restart_text, (SCREEN_WIDTH//4, SCREEN_HEIGHT - 100))
     pygame.display.flip()
 
 
-def natural_sort_key(path):
-    """Convert string with numbers into tuple of strings and integers for natural sorting."""
-    parts = re.split('([0-9]+)', path.stem)
-    return [int(part) if part.isdigit() else part.lower() for part in parts]
-
-
 def draw_menu():
     """Draw the level selection menu with leaderboard info and scrolling support."""
     screen.fill(WHITE)
-    title = font.render("4D Maze - Level Select", True, BLACK)
+    title = text_cache.render(font, "4D Maze - Level Select", BLACK)
     screen.blit(title, (SCREEN_WIDTH//4, 50))
 
     # Add scroll_offset as a static variable to track scrolling
     if not hasattr(draw_menu, 'scroll_offset'):
         draw_menu.scroll_offset = 0
 
-    leaderboard = load_leaderboard()
+    best = best_scores()
     
-    # Scan levels directory for available levels
-    levels_path = Path("levels")
-    level_files = sorted(levels_path.glob("*.json"), key=natural_sort_key)  # Natural sort by filename
+    # Level metadata comes from the index; only changed files are re-read
+    if not hasattr(draw_menu, 'level_index'):
+        draw_menu.level_index = LevelIndex(Path("levels"))
+    level_entries = draw_menu.level_index.refresh()  # Natural sort by filename
+    level_files = [Path(entry['file']) for entry in level_entries]
     
     # Calculate maximum scroll offset
     max_scroll = max(0, (len(level_files) - LEVELS_PER_PAGE) * BUTTON_HEIGHT)
@@ -358,24 +422,21 @@ def draw_menu():
 
     y = 120 - draw_menu.scroll_offset
     
-    for level_file in level_files:
-        level_id = level_file.stem
+    for level_data in level_entries:
+        level_id = level_data['level_id']
 
         # Skip drawing if button is completely outside visible area
         if y + BUTTON_HEIGHT < 120 or y > 120 + (LEVELS_PER_PAGE * BUTTON_HEIGHT):
             y += BUTTON_HEIGHT
             continue
 
-        # Load level data to get difficulty and size
-        with open(level_file, 'r') as f:
-            level_data = json.load(f)
-        
         # Get top score if available
         top_score = "No scores yet"
-        if level_id in leaderboard.get("levels", {}):
-            if leaderboard["levels"][level_id]:
-                top_player = leaderboard["levels"][level_id][0]
-                top_score = f"Best: {top_player['name']} - {top_player['steps']} steps"
+        if level_id in best:
+            top_player = best[level_id]
+            top_score = f"Best: {top_player['name']} - {top_player['steps']} steps"
+        if level_data['optimal_steps'] is not None:
+            top_score += f" (par {level_data['optimal_steps']})"
         
         # Draw level button and info
         button_rect = pygame.Rect(SCREEN_WIDTH//4, y, SCREEN_WIDTH//2, 60)
@@ -383,10 +444,10 @@ def draw_menu():
         pygame.draw.rect(screen, BLACK, button_rect, 2)
         
         level_text = f"{level_id.replace('_', ' ').title()} - {level_data['size']}x{level_data['size']}x{level_data['size']}x{level_data['size']} - Difficulty: {level_data['difficulty']}"
-        text = font.render(level_text, True, BLACK)
+        text = text_cache.render(font, level_text, BLACK)
         screen.blit(text, (SCREEN_WIDTH//4 + 10, y + 10))
         
-        score_text = font.render(top_score, True, FONT_COLOR)
+        score_text = text_cache.render(font, top_score, FONT_COLOR)
         screen.blit(score_text, (SCREEN_WIDTH//4 + 10, y + 35))
         
         y += BUTTON_HEIGHT
@@ -412,108 +473,254 @@ def draw_menu():
     return level_files, scroll_area
 
 
-def main():
+def menu_level_at(pos, scroll_area, level_files):
+    """The level file under a screen position in the menu, or None."""
+    if scroll_area is None or not scroll_area.collidepoint(pos):
+        return None
+    # Adjust y position for scroll offset
+    adjusted_y = pos[1] + draw_menu.scroll_offset - 120
+    level_index = adjusted_y // BUTTON_HEIGHT
+    if 0 <= level_index < len(level_files):
+        return level_files[level_index]
+    return None
+
+
+def draw_loading(job):
+    """Draw the loading screen: level name, current stage and a progress bar."""
+    screen.fill(WHITE)
+    title = text_cache.render(font, f"Loading {job.filename.stem.replace('_', ' ').title()}", BLACK)
+    screen.blit(title, title.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 60)))
+
+    bar = pygame.Rect(SCREEN_WIDTH // 4, SCREEN_HEIGHT // 2 - 15, SCREEN_WIDTH // 2, 30)
+    filled = bar.copy()
+    filled.width = int(bar.width * min(1.0, max(0.0, job.progress)))
+    pygame.draw.rect(screen, GOAL_COLOR, filled)
+    pygame.draw.rect(screen, BLACK, bar, 2)
+
+    stage = font.render(f"{job.stage} - {int(job.progress * 100)}%", True, FONT_COLOR)
+    screen.blit(stage, stage.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 40)))
+    cancel = text_cache.render(small_font, "Press ESC to cancel", FONT_COLOR)
+    screen.blit(cancel, cancel.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 80)))
+    pygame.display.flip()
+
+
+def post_hints_ready(future):
+    """Background callback: hand a finished hint field to the main loop."""
+    pygame.event.post(pygame.event.Event(HINTS_READY, future=future))
+
+
+def hints_result(future):
+    """The HintField of a finished hints future, or None if computing it failed."""
+    try:
+        return future.result()
+    except Exception as error:
+        print(f"Could not compute hints: {error}")
+        return None
+
+
+def post_level_loaded(job):
+    """LevelLoader callback: hand a finished job to the main loop (thread-safe)."""
+    pygame.event.post(pygame.event.Event(LEVEL_LOADED, job=job))
+
+
+def draw_profile_overlay():
+    """Show FPS and p50/p99 frame times at the bottom of the screen (--profile)."""
+    p50, p99 = profiler.percentiles(0.5, 0.99)
+    text = f"FPS {profiler.fps():5.1f} | frame p50 {p50 * 1000:6.2f} ms  p99 {p99 * 1000:6.2f} ms"
+    rect = PROFILE_LINE.draw(screen, small_font, ((text, FONT_COLOR),), WHITE, force=True)
+    pygame.display.update(rect)
+
+
+def next_events(paced=False):
+    """
+    Return the pending input events.
+    Normally this blocks until an event arrives (or IDLE_TIMEOUT passes), so
+    an idle game uses no CPU. In paced mode it polls once per frame at
+    FRAME_RATE instead, for animations that must advance without input.
+    """
+    if paced:
+        with profiler.span(WAIT):
+            clock.tick(FRAME_RATE)
+        return pygame.event.get()
+
+    with profiler.span(WAIT):
+        event = pygame.event.wait(IDLE_TIMEOUT)
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
+
+def main(paced=False, trace_file=TRACE_FILE):
     running = True
     in_menu = True
     current_level = None
     score_added = False  # Track if the score has been added
-    player_pos = None
-    walls = None
-    start_pos = None
-    goal_pos = None
-    DIMENSION_SIZE = None
-    MAZE = None
-    current_plane = 'XY'
-    steps_taken = 0
+    state = None  # GameState of the current run
     game_won = False
     show_instructions = False  # Initialize as False
+    needs_redraw = True  # Only redraw after something changed
+    level_files, scroll_area = [], None
+    loading_job = None  # Level being loaded in the background
+    hint_field = None  # HintField of the current level, once computed
+    hints_future = None
+    show_hint = False
+    show_overview = True
+    hovered_file = None
 
     while running:
-        if in_menu:
-            screen.fill(WHITE)
-            level_files, scroll_area = draw_menu()
-            
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                    player_pos, steps_taken, current_plane, show_instructions, score_added = reset_game(start_pos)
-                
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:  # Left click
-                        mouse_pos = pygame.mouse.get_pos()
-                        if scroll_area.collidepoint(mouse_pos):
-                            # Adjust y position for scroll offset
-                            adjusted_y = mouse_pos[1] + draw_menu.scroll_offset - 120
-                            level_index = adjusted_y // BUTTON_HEIGHT
-                            
-                            if 0 <= level_index < len(level_files):
-                                level_file = level_files[level_index]
-                                level_data = load_level(level_file)
-                                walls, start_pos, goal_pos, DIMENSION_SIZE, MAZE = initialize_game(level_data)
-                                player_pos = start_pos.copy()
-                                current_level = level_file.stem
-                                in_menu = False
-                                game_won = False
-                                show_instructions = False
-                    
-                    elif event.button == 4:  # Mouse wheel up
-                        draw_menu.scroll_offset = max(0, draw_menu.scroll_offset - MENU_SCROLL_SPEED)
-                    elif event.button == 5:  # Mouse wheel down
-                        draw_menu.scroll_offset += MENU_SCROLL_SPEED
-        else:
-            for event in pygame.event.get():
+        if needs_redraw:
+            if loading_job is not None:
+                with profiler.span("draw_loading"):
+                    draw_loading(loading_job)
+            elif in_menu:
+                with profiler.span("draw_menu"):
+                    level_files, scroll_area = draw_menu()
+            elif not game_won:
+                # Check win condition and handle score/leaderboard display
+                if state.won:
+                    game_won = True
+                    with profiler.span("add_score"):
+                        add_score(state.steps, current_level, state.log)
+                    with profiler.span("show_leaderboard"):
+                        show_leaderboard(load_leaderboard(), current_level)
+                else:
+                    hint = None
+                    if show_hint and hints_future is not None and hints_future.done():
+                        # Its HINTS_READY may have gone to the score dialog's event loop
+                        hint_field, hints_future = hints_result(hints_future), None
+                    if show_hint:
+                        hint = hint_field.hint(state.pos, state.plane) if hint_field is not None else HINT_PENDING
+                    with profiler.span("draw_maze"):
+                        draw_maze(state.pos, state.grid, state.goal, state.size, state.plane, state.steps,
+                                  show_instructions, hint, show_overview)
+            needs_redraw = paced  # Paced mode repaints every frame
+        if profiler.enabled:
+            with profiler.span("profile_overlay"):
+                draw_profile_overlay()
+        profiler.end_frame()
+
+        events = next_events(paced)
+        if events or paced:
+            profiler.begin_frame()  # Frames span input handling and the redraw it causes
+        with profiler.span("events"):
+            for event in events:
                 if event.type == pygame.QUIT:
-                    player_pos, steps_taken, current_plane, show_instructions, score_added = reset_game(start_pos)
                     running = False
-                
-                if event.type == pygame.KEYDOWN:
+            
+                elif event.type == pygame.WINDOWEXPOSED:
+                    invalidate_maze()
+                    needs_redraw = True
+
+                elif event.type == LEVEL_LOADED:
+                    job = event.job
+                    if job is not loading_job:
+                        continue  # Cancelled or superseded
+                    loading_job = None
+                    pygame.time.set_timer(LOADING_TICK, 0)
+                    if job.ok:
+                        # Hints are read from disk or computed in the background
+                        hint_field = None
+                        hints_future = loader.submit(load_hints, job.filename, job.level_data,
+                                                     on_done=post_hints_ready)
+                        state = initialize_game(job.level_data)
+                        show_instructions, score_added = reset_game(state)
+                        current_level = job.filename.stem
+                        invalidate_maze()
+                        in_menu = False
+                        game_won = False
+                    elif job.error is not None:
+                        print(f"Could not load {job.filename}: {job.error}")
+                    needs_redraw = True
+
+                elif event.type == HINTS_READY:
+                    if event.future is hints_future:
+                        hint_field, hints_future = hints_result(hints_future), None
+                        needs_redraw = needs_redraw or show_hint
+
+                elif loading_job is not None:
+                    if event.type == LOADING_TICK:
+                        needs_redraw = True
+                    elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                        loader.cancel(loading_job)
+                        loading_job = None
+                        pygame.time.set_timer(LOADING_TICK, 0)
+                        needs_redraw = True
+
+                elif in_menu:
+                    if event.type == pygame.MOUSEMOTION:
+                        # Prefetch the level under the mouse so clicking it is instant
+                        level_file = menu_level_at(event.pos, scroll_area, level_files)
+                        if level_file is not None and level_file != hovered_file:
+                            loader.prefetch(level_file)
+                        hovered_file = level_file
+
+                    elif event.type == pygame.MOUSEBUTTONDOWN:
+                        if event.button == 1:  # Left click
+                            level_file = menu_level_at(event.pos, scroll_area, level_files)
+                            if level_file is not None:
+                                loading_job = loader.request(level_file, on_done=post_level_loaded)
+                                if not loading_job.done.is_set():
+                                    # Show the loading screen until LEVEL_LOADED arrives
+                                    pygame.time.set_timer(LOADING_TICK, LOADING_TICK_MS)
+                                    needs_redraw = True
+
+                        elif event.button == 4:  # Mouse wheel up
+                            draw_menu.scroll_offset = max(0, draw_menu.scroll_offset - MENU_SCROLL_SPEED)
+                            needs_redraw = True
+                        elif event.button == 5:  # Mouse wheel down
+                            draw_menu.scroll_offset += MENU_SCROLL_SPEED
+                            needs_redraw = True
+
+                elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:  # return to menu
                         in_menu = True
-                        player_pos, steps_taken, current_plane, show_instructions, score_added = reset_game(start_pos)
-                        
+                        game_won = False
+                        show_instructions, score_added = reset_game(state)
+                        needs_redraw = True
+
+                    elif game_won:
+                        if event.key == pygame.K_SPACE:  # play again
+                            show_instructions, score_added = reset_game(state)
+                            invalidate_maze()
+                            game_won = False
+                            needs_redraw = True
+
                     elif event.key == pygame.K_i:  # Toggle instructions with 'i' key
                         show_instructions = not show_instructions
-                    
-                    # Movement code (one block movement on key press)
-                    if event.key == pygame.K_UP:
-                        player_pos, steps_taken = move_player(player_pos, steps_taken, (0, -1), current_plane, DIMENSION_SIZE, walls)
-                    if event.key == pygame.K_DOWN:
-                        player_pos, steps_taken = move_player(player_pos, steps_taken, (0, 1), current_plane, DIMENSION_SIZE, walls)
-                    if event.key == pygame.K_LEFT:
-                        player_pos, steps_taken = move_player(player_pos, steps_taken, (-1, 0), current_plane, DIMENSION_SIZE, walls)
-                    if event.key == pygame.K_RIGHT:
-                        player_pos, steps_taken = move_player(player_pos, steps_taken, (1, 0), current_plane, DIMENSION_SIZE, walls)
-                
-            if not game_won:
-                keys = pygame.key.get_pressed()
-                if keys[pygame.K_1]: current_plane = switch_plane(current_plane, 'XY')
-                if keys[pygame.K_2]: current_plane = switch_plane(current_plane, 'XZ')
-                if keys[pygame.K_3]: current_plane = switch_plane(current_plane, 'XT')
-                if keys[pygame.K_4]: current_plane = switch_plane(current_plane, 'YZ')
-                if keys[pygame.K_5]: current_plane = switch_plane(current_plane, 'YT')
-                if keys[pygame.K_6]: current_plane = switch_plane(current_plane, 'ZT')
-                
-                # Check win condition and handle score/leaderboard display
-                if player_pos == goal_pos:
-                    game_won = True
-                    add_score(steps_taken, current_level)
-                    show_leaderboard(load_leaderboard(), current_level)
-                else:
-                    draw_maze(player_pos, walls, goal_pos, DIMENSION_SIZE, current_plane, steps_taken, show_instructions)
+                        needs_redraw = True
+
+                    elif event.key == pygame.K_h:  # Toggle next-move hints
+                        show_hint = not show_hint
+                        needs_redraw = True
 
-            if game_won:
-                keys = pygame.key.get_pressed()
-                if keys[pygame.K_SPACE]:
-                    player_pos, steps_taken, current_plane, show_instructions, score_added = reset_game(start_pos)
-                    game_won = False
+                    elif event.key == pygame.K_o:  # Toggle the six-plane overview
+                        show_overview = not show_overview
+                        needs_redraw = True
 
+                    elif event.key in MOVE_KEYS:  # one block movement on key press
+                        needs_redraw = state.move(*MOVE_KEYS[event.key]) or needs_redraw
 
-        pygame.display.flip()
-        clock.tick(30)
+                    elif event.key in PLANE_KEYS:
+                        needs_redraw = state.switch_plane(PLANE_KEYS[event.key]) or needs_redraw
 
+    loader.shutdown()
+    if profiler.enabled:
+        for name, stats in profiler.summary().items():
+            print(f"{name:<18} {stats['count']:>7} spans  {stats['total_ms']:>10.1f} ms total  {stats['mean_ms']:>8.3f} ms mean")
+        if profiler.export_chrome_trace(trace_file):
+            print(f"Trace saved to {trace_file} (open in chrome://tracing or ui.perfetto.dev)")
     pygame.quit()
     sys.exit()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Play the 4D maze')
+    parser.add_argument('--paced', action='store_true',
+                        help=f'Redraw at a fixed {FRAME_RATE} FPS instead of only when input arrives')
+    parser.add_argument('--profile', action='store_true',
+                        help='Time each phase of the main loop, show FPS and frame times, and export a trace')
+    parser.add_argument('--trace', type=Path, default=Path(TRACE_FILE),
+                        help=f'Chrome trace output for --profile (default: {TRACE_FILE})')
+    args = parser.parse_args()
+    profiler.enabled = args.profile
+    main(args.paced, args.trace)
\ No newline at end of file
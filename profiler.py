@@ -0,0 +1,128 @@
+"""
+Opt-in frame profiler.
+
+Code marks the phases it wants timed with `profiler.span(name)`. When the
+profiler is disabled that returns a shared no-op context manager, so the
+instrumentation costs one attribute check per phase. When enabled, each
+span is recorded with its thread and start time, frame times are kept for
+FPS and percentile stats, and the spans can be exported as Chrome trace
+event JSON (open it in chrome://tracing or https://ui.perfetto.dev).
+
+Time spent in spans named WAIT (blocking on input) is not counted towards
+frame times.
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+WAIT = "wait"
+NULL_SPAN = nullcontext()
+
+
+class Span:
+    """Context manager recording one timed phase."""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.profiler.record(self.name, self.start, end - self.start)
+        return False
+
+
+class Profiler:
+    """Per-phase timers, frame statistics and trace export."""
+
+    def __init__(self, enabled: bool = False, max_frames: int = 600, max_spans: int = 200_000):
+        self.enabled = enabled
+        self.spans = deque(maxlen=max_spans)  # (name, thread id, start ns, duration ns)
+        self.frame_times = deque(maxlen=max_frames)  # Seconds of work per frame
+        self.frame_ends = deque(maxlen=max_frames)  # perf_counter() at the end of each frame
+        self.frame_start = None
+        self.frame_wait = 0
+        self.origin = time.perf_counter_ns()
+
+    def span(self, name: str):
+        """Context manager timing one phase (a no-op when disabled)."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name)
+
+    def record(self, name: str, start: int, duration: int):
+        self.spans.append((name, threading.get_ident(), start, duration))
+        if name == WAIT and self.frame_start is not None:
+            self.frame_wait += duration
+
+    def begin_frame(self):
+        if self.enabled and self.frame_start is None:
+            self.frame_start = time.perf_counter_ns()
+            self.frame_wait = 0
+
+    def end_frame(self):
+        """Close the current frame, if one was begun."""
+        if self.frame_start is None:
+            return
+        end = time.perf_counter_ns()
+        self.frame_times.append((end - self.frame_start - self.frame_wait) / 1e9)
+        self.frame_ends.append(end / 1e9)
+        self.record("frame", self.frame_start, end - self.frame_start)
+        self.frame_start = None
+
+    def fps(self, window: float = 1.0) -> float:
+        """Frames finished during the last `window` seconds, per second."""
+        now = time.perf_counter_ns() / 1e9
+        return sum(1 for end in self.frame_ends if now - end <= window) / window
+
+    def percentiles(self, *quantiles: float) -> List[float]:
+        """Frame time quantiles in seconds (0.0 when there are no frames)."""
+        times = sorted(self.frame_times)
+        if not times:
+            return [0.0 for _ in quantiles]
+        return [times[min(len(times) - 1, int(q * len(times)))] for q in quantiles]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, total and mean duration (ms) of each span name."""
+        totals = {}
+        for name, _, _, duration in self.spans:
+            count, total = totals.get(name, (0, 0))
+            totals[name] = (count + 1, total + duration)
+        return {name: {"count": count, "total_ms": total / 1e6, "mean_ms": total / count / 1e6}
+                for name, (count, total) in sorted(totals.items(), key=lambda item: -item[1][1])}
+
+    def chrome_trace(self) -> Dict:
+        """The recorded spans as Chrome trace events (complete events, microseconds)."""
+        pid = os.getpid()
+        events = [{
+            "name": name,
+            "ph": "X",
+            "ts": (start - self.origin) / 1000,
+            "dur": duration / 1000,
+            "pid": pid,
+            "tid": tid
+        } for name, tid, start, duration in self.spans]
+        events += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": thread.ident,
+                    "args": {"name": thread.name}} for thread in threading.enumerate()]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, filename: Union[str, Path]) -> Optional[Path]:
+        """Write the trace JSON; returns the path, or None if nothing was recorded."""
+        if not self.spans:
+            return None
+        with open(filename, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+        return Path(filename)
+
+
+profiler = Profiler()
@@ -0,0 +1,194 @@
+"""
+Procedural levels stored as a seed.
+
+A `.tbseed` file is a small JSON document with the generator version,
+seed and parameters of a level, plus the facts the menu shows (size,
+difficulty, start, goal, wall count and, when known, optimal steps). The
+walls are rebuilt on demand by level_generator.generate_seeded_level,
+which is deterministic for a given NumPy RNG stream, and checked against
+the content hash (solution_cache.level_key) stored in the file, so a
+generator or NumPy change that yields a different maze is an error
+rather than a silently different level. Rebuilt levels are kept in a
+size-bounded on-disk cache of uncompressed binary levels, so reopening a
+level only reads its file instead of generating it again. Once the cache
+outgrows its byte budget the least recently used levels are evicted.
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from level_format import BINARY_EXTENSION, Progress, load_binary_level, save_binary_level
+from level_generator import SEED_GENERATOR_VERSION, generate_seeded_level
+from solution_cache import level_key
+
+SEED_FORMAT = 'seed'
+SEED_CACHE_DIR = '.level_cache'
+SEED_CACHE_BYTES = 64 << 20
+
+
+class SeedCache:
+    """Rebuilt seed levels as binary level files, evicted least recently used first."""
+
+    def __init__(self, path: Union[str, Path] = SEED_CACHE_DIR, max_bytes: int = SEED_CACHE_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, info: Dict) -> str:
+        """Cache key of a seed level: hash of everything that determines its walls."""
+        identity = {"version": info['version'], "seed": info['seed'], "params": info['params']}
+        return hashlib.sha1(json.dumps(identity, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        filename = self.path / f"{key}{BINARY_EXTENSION}"
+        try:
+            level_data = load_binary_level(filename)
+            os.utime(filename)  # Mark as recently used
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return level_data
+
+    def put(self, key: str, level_data: Dict):
+        """Store a rebuilt level, then evict old entries beyond the byte budget."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        os.close(fd)
+        try:
+            save_binary_level(level_data, temp)
+            os.replace(temp, self.path / f"{key}{BINARY_EXTENSION}")  # Loaders never see half a file
+        except BaseException:
+            os.unlink(temp)
+            raise
+        self.prune()
+
+    def entries(self):
+        """(mtime, bytes, path) of every cached level, oldest first."""
+        entries = []
+        for filename in self.path.glob(f"*{BINARY_EXTENSION}"):
+            try:
+                stat = filename.stat()
+            except FileNotFoundError:
+                continue  # Evicted by another process
+            entries.append((stat.st_mtime, stat.st_size, filename))
+        return sorted(entries)
+
+    def prune(self) -> int:
+        """Delete the least recently used levels until the cache fits; returns how many."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, filename in entries[:-1]:  # Always keep the newest
+            if total <= self.max_bytes:
+                break
+            filename.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> int:
+        entries = self.entries()
+        for _, _, filename in entries:
+            filename.unlink(missing_ok=True)
+        return len(entries)
+
+    def stats(self) -> Dict:
+        entries = self.entries()
+        return {
+            "levels": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+cache = SeedCache()
+
+
+def read_seed_file(filename: Union[str, Path]) -> Dict:
+    with open(filename, 'r') as f:
+        info = json.load(f)
+    if info.get('format') != SEED_FORMAT:
+        raise ValueError(f"{filename}: not a seed level file")
+    return info
+
+
+def load_seed_level(filename: Union[str, Path], progress: Progress = None,
+                    seed_cache: Optional[SeedCache] = cache) -> Dict:
+    """
+    Load a seed level, rebuilding its walls unless they are cached.
+    Raises ValueError if the generator no longer reproduces the level.
+    """
+    info = read_seed_file(filename)
+    key = seed_cache.key(info) if seed_cache else None
+    level_data = seed_cache.get(key) if seed_cache else None
+    if level_data is None:
+        if info['version'] != SEED_GENERATOR_VERSION:
+            raise ValueError(f"{filename}: made by seed generator version {info['version']}, "
+                             f"this is version {SEED_GENERATOR_VERSION}")
+        if progress:
+            progress("Generating", 0.1)
+        level_data = generate_seeded_level(info['params'], info['seed'])
+        rebuilt_key = level_key(level_data)
+        if (level_data['start'] != info['start'] or level_data['goal'] != info['goal']
+                or level_data['grid'].wall_count != info['wall_count']
+                or info.get('level_key', rebuilt_key) != rebuilt_key):  # Older files have no hash
+            raise ValueError(f"{filename}: the seeded generator no longer reproduces this level")
+        level_data['difficulty'] = info['difficulty']
+        if seed_cache:
+            if progress:
+                progress("Caching", 0.9)
+            seed_cache.put(key, level_data)
+    return level_data
+
+
+def save_seed_level(level_data: Dict, filename: Union[str, Path]) -> Path:
+    """Save a level made by generate_seeded_level as a seed file."""
+    procedural = level_data.get('procedural')
+    if procedural is None:
+        raise ValueError("Only levels made by level_generator.generate_seeded_level can be saved as seeds")
+    info = {
+        "format": SEED_FORMAT,
+        "version": procedural['version'],
+        "seed": procedural['seed'],
+        "params": procedural['params'],
+        "start": list(level_data['start']),
+        "goal": list(level_data['goal']),
+        "size": level_data['size'],
+        "difficulty": level_data['difficulty'],
+        "wall_count": level_data['grid'].wall_count,
+        "level_key": level_key(level_data),
+        "optimal_steps": level_data.get('optimal_steps')
+    }
+    with open(filename, 'w') as f:
+        json.dump(info, f, indent=4)
+    return Path(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the cache of rebuilt seed levels')
+    parser.add_argument('command', choices=['stats', 'prune', 'clear'])
+    parser.add_argument('--max-bytes', type=int, default=SEED_CACHE_BYTES,
+                        help=f'Cache budget for prune (default: {SEED_CACHE_BYTES})')
+    args = parser.parse_args()
+
+    seed_cache = SeedCache(max_bytes=args.max_bytes)
+    if args.command == 'stats':
+        stats = seed_cache.stats()
+        print(f"{stats['levels']} cached levels, {stats['bytes']} bytes "
+              f"(budget {stats['max_bytes']}) in {seed_cache.path}")
+    elif args.command == 'prune':
+        print(f"Removed {seed_cache.prune()} cached levels")
+    else:
+        print(f"Removed {seed_cache.clear()} cached levels")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Persistent cache of level solutions, keyed by level content.
+
+The key is a SHA-1 of the level size, start, goal and walls (the wall grid
+bit-packed in cell order, equivalent to the sorted wall list), so copies
+of a level in JSON, binary or seed files share one entry and an edited
+level never hits a stale one. Each entry holds the shortest path length,
+the path packed as one direction code per nibble, and the number of
+cells reachable from the start. Entries live in SQLite and are evicted least
+recently used beyond `max_entries`; hit and miss counters are kept in the
+database so `python3 solution_cache.py stats` reports the hit rate across
+runs. Lookups only read: their counter and last-used updates are batched
+and written with the next store, every FLUSH_EVERY lookups or at exit, so
+batch solves in many processes do not queue on the database's write lock.
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from multiprocessing import util
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+from chunked_grid import ChunkedGrid
+from level_grid import DIRECTIONS, LevelGrid
+
+SOLUTION_CACHE_DB = '.solution_cache.db'
+DEFAULT_MAX_ENTRIES = 10000
+FLUSH_EVERY = 256  # Lookups between writes of their batched bookkeeping
+PAD = 0xF
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    key TEXT PRIMARY KEY,
+    solvable INTEGER NOT NULL,
+    steps INTEGER NOT NULL,
+    path BLOB NOT NULL,
+    reachable INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Unit vector of each direction code (level_grid.DIRECTIONS order)
+DIRECTION_VECTORS = np.array([[delta if axis == dim else 0 for axis in range(4)]
+                              for dim, delta in DIRECTIONS], dtype=np.int64)
+
+
+class CachedSolution(NamedTuple):
+    solvable: bool
+    steps: int
+    path: List[List[int]]
+    reachable: int  # Open cells reachable from the start (-1 if not counted)
+
+
+def level_key(level_data: Dict) -> str:
+    """Content hash of a level: size, start, goal and its walls."""
+    digest = hashlib.sha1()
+    grid = level_data.get('grid')
+    if isinstance(grid, ChunkedGrid):
+        # Chunked levels are hashed in their own (canonical) tile form
+        digest.update(b'chunked')
+        digest.update(np.ascontiguousarray(grid.kinds).tobytes())
+        for first in range(0, grid.mixed_count, 4096):
+            digest.update(np.ascontiguousarray(grid.bits[first:first + 4096]).tobytes())
+        size = grid.size
+    else:
+        grid = LevelGrid.from_level_data(level_data)
+        digest.update(np.packbits(grid.cells.ravel()).tobytes())
+        size = grid.size
+    digest.update(repr((size, list(level_data['start']), list(level_data['goal']))).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def pack_path(path: List[List[int]]) -> bytes:
+    """Direction codes of a path's steps, two per byte (first step in the high nibble)."""
+    if len(path) < 2:
+        return b''
+    steps = np.diff(np.asarray(path, dtype=np.int64), axis=0)
+    dims = np.abs(steps).argmax(axis=1)
+    codes = (2 * dims + (steps[np.arange(len(steps)), dims] < 0)).astype(np.uint8)
+    if len(codes) % 2:
+        codes = np.append(codes, np.uint8(PAD))
+    return ((codes[0::2] << 4) | codes[1::2]).tobytes()
+
+
+def unpack_path(start: List[int], packed: bytes, steps: int) -> List[List[int]]:
+    """Inverse of pack_path, given the path's start and number of steps."""
+    raw = np.frombuffer(packed, dtype=np.uint8)
+    codes = np.stack([raw >> 4, raw & 0xF], axis=1).ravel()[:steps]
+    moves = np.vstack([np.asarray(start, dtype=np.int64)[None], DIRECTION_VECTORS[codes]])
+    return np.cumsum(moves, axis=0).tolist()
+
+
+class SolutionCache:
+    """
+    Solutions by level key, in SQLite. The database is opened on first
+    use; with `enabled` False every lookup misses and nothing is stored.
+    """
+
+    def __init__(self, path: Union[str, Path] = SOLUTION_CACHE_DB, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 enabled: bool = True):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.conn = None
+        self.pid = None
+        self.reset_pending()
+
+    def reset_pending(self):
+        self.hits = 0
+        self.misses = 0
+        self.used = {}  # key -> last lookup time, not yet written
+
+    def connect(self) -> sqlite3.Connection:
+        # Worker processes forked after the first use open their own connection
+        if self.conn is None or self.pid != os.getpid():
+            if self.pid != os.getpid():
+                self.reset_pending()  # A forked copy's pending updates are the parent's to write
+                util.Finalize(self, self.flush, exitpriority=10)  # Also runs in pool workers
+            self.conn = sqlite3.connect(str(self.path), timeout=10)
+            self.pid = os.getpid()
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            with self.conn:
+                self.conn.executescript(SCHEMA)
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+
+    def write_pending(self, conn: sqlite3.Connection):
+        """Write batched lookup bookkeeping, inside the caller's transaction."""
+        for name, value in (("hits", self.hits), ("misses", self.misses)):
+            if value:
+                conn.execute("INSERT INTO counters (name, value) VALUES (?, ?) "
+                             "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value", (name, value))
+        conn.executemany("UPDATE solutions SET last_used = ? WHERE key = ?",
+                         [(used, key) for key, used in self.used.items()])
+        self.reset_pending()
+
+    def flush(self):
+        if self.hits or self.misses:
+            conn = self.connect()
+            with conn:
+                self.write_pending(conn)
+
+    def get(self, key: str, start: List[int]) -> Optional[CachedSolution]:
+        if not self.enabled:
+            return None
+        conn = self.connect()
+        row = conn.execute("SELECT solvable, steps, path, reachable FROM solutions WHERE key = ?",
+                           (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.used[key] = time.time()
+        if self.hits + self.misses >= FLUSH_EVERY:
+            self.flush()
+        if row is None:
+            return None
+        solvable, steps, packed, reachable = row
+        path = unpack_path(start, packed, steps) if solvable else []
+        return CachedSolution(bool(solvable), steps, path, reachable)
+
+    def put(self, key: str, solution: CachedSolution):
+        """Store a solution, evicting the least recently used beyond max_entries."""
+        if not self.enabled:
+            return
+        conn = self.connect()
+        with conn:
+            self.write_pending(conn)
+            conn.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?)",
+                         (key, int(solution.solvable), solution.steps, pack_path(solution.path),
+                          solution.reachable, time.time()))
+            conn.execute("DELETE FROM solutions WHERE key IN (SELECT key FROM solutions "
+                         "ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def clear(self) -> int:
+        conn = self.connect()
+        with conn:
+            removed = conn.execute("DELETE FROM solutions").rowcount
+            conn.execute("DELETE FROM counters")
+        self.reset_pending()
+        return removed
+
+    def stats(self) -> Dict:
+        conn = self.connect()
+        self.flush()
+        entries, path_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(path)), 0) FROM solutions").fetchone()
+        counters = dict(conn.execute("SELECT name, value FROM counters"))
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "path_bytes": path_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0
+        }
+
+
+solutions = SolutionCache()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect the cache of level solutions')
+    parser.add_argument('command', choices=['stats', 'clear'])
+    args = parser.parse_args()
+
+    if args.command == 'stats':
+        stats = solutions.stats()
+        print(f"{stats['entries']}/{stats['max_entries']} solutions cached "
+              f"({stats['path_bytes']} bytes of paths) in {solutions.path}")
+        print(f"{stats['hits']} hits, {stats['misses']} misses, hit rate {stats['hit_rate']:.1%}")
+    else:
+        print(f"Removed {solutions.clear()} cached solutions")
+    solutions.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,202 @@
+from array import array
 from collections import deque
-from typing import List, Dict, Set, Tuple
-import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from heapq import heappush, heappop
+from typing import Iterator, List, Dict, NamedTuple, Optional, Set, Tuple
 from pathlib import Path
 import argparse
+import csv
+import json
+import os
 import sys
+import time
+
+import numpy as np
+
+from chunked_grid import ChunkedGrid, POPCOUNT, TILE
+from level_grid import DIRECTIONS, LevelGrid, PLANES
+from level_format import find_level_file, load_level, list_level_files, natural_sort_key
+from solution_cache import CachedSolution, level_key, solutions
+
+class SolveResult(NamedTuple):
+    """Outcome of a single start-goal search."""
+    solvable: bool
+    path: List[List[int]]
+    steps: int
+    nodes_expanded: int
+    elapsed: float  # Seconds
+    algorithm: str
+
+class FlatGraph:
+    """
+    Open cells of a LevelGrid addressed by flat integer indices.
+    The grid is padded with a one-cell wall border, so the neighbours of
+    index i are simply i + offset for each entry in `offsets` and never
+    need a bounds check.
+    """
+
+    def __init__(self, grid: LevelGrid):
+        self.size = grid.size
+        padded_size = grid.size + 2
+        padded = np.ones((padded_size,) * 4, dtype=bool)
+        padded[1:-1, 1:-1, 1:-1, 1:-1] = grid.cells
+        self.padded_size = padded_size
+        self.cell_count = padded.size
+        self.open = bytearray((~padded).ravel().tobytes())
+        self.strides = (padded_size ** 3, padded_size ** 2, padded_size, 1)
+        # Same order as level_grid.DIRECTIONS: (+X, -X, +Y, -Y, +Z, -Z, +T, -T)
+        self.offsets = tuple(stride * delta for stride in self.strides for delta in (1, -1))
 
-def is_valid_move(pos: List[int], size: int, walls: List[List[int]]) -> bool:
+    def index(self, pos: List[int]) -> int:
+        """Flat index of a 4D position."""
+        return sum((c + 1) * stride for c, stride in zip(pos, self.strides))
+
+    def position(self, index: int) -> List[int]:
+        """4D position of a flat index."""
+        pos = []
+        for stride in self.strides:
+            c, index = divmod(index, stride)
+            pos.append(c - 1)
+        return pos
+
+    def is_open(self, pos: List[int]) -> bool:
+        return all(0 <= c < self.size for c in pos) and bool(self.open[self.index(pos)])
+
+    def path(self, parent: array, start: int, end: int) -> List[List[int]]:
+        """Walk parent pointers back from `end` to `start`."""
+        indices = [end]
+        while indices[-1] != start:
+            indices.append(parent[indices[-1]])
+        indices.reverse()
+        return [self.position(i) for i in indices]
+
+def is_valid_move(pos: List[int], grid: LevelGrid) -> bool:
     """Check if a position is valid (within bounds and not a wall)."""
-    return (all(0 <= x < size for x in pos) and 
-            pos not in walls)
+    return grid.is_open(pos)
 
-def get_neighbors(pos: List[int], size: int, walls: List[List[int]]) -> List[List[int]]:
+def get_neighbors(pos: List[int], grid: LevelGrid) -> List[List[int]]:
     """Get all valid neighboring positions in 4D space."""
-    neighbors = []
     # Check all possible moves in each dimension (±1 in each dimension)
-    for dim in range(4):  # 4 dimensions: X, Y, Z, T
-        for delta in [-1, 1]:
-            new_pos = pos.copy()
-            new_pos[dim] += delta
-            if is_valid_move(new_pos, size, walls):
-                neighbors.append(new_pos)
-    return neighbors
+    return grid.neighbors(pos)
+
+def _bfs(graph: FlatGraph, start: int, goal: int) -> Tuple[List[List[int]], int]:
+    """Breadth-first search storing one parent index per cell."""
+    open_cells, offsets = graph.open, graph.offsets
+    parent = array('i', [-1]) * graph.cell_count
+    parent[start] = start
+    queue = deque([start])
+    expanded = 0
+
+    while queue:
+        current = queue.popleft()
+        expanded += 1
+        if current == goal:
+            return graph.path(parent, start, goal), expanded
+        for offset in offsets:
+            nxt = current + offset
+            if open_cells[nxt] and parent[nxt] < 0:
+                parent[nxt] = current
+                queue.append(nxt)
+
+    return [], expanded
 
-def bfs_solve(start: List[int], goal: List[int], size: int, 
-              walls: List[List[int]]) -> Tuple[bool, List[List[int]], int]:
+def _bidirectional(graph: FlatGraph, start: int, goal: int) -> Tuple[List[List[int]], int]:
+    """
+    Breadth-first search from both ends, always expanding the smaller
+    frontier one full layer at a time. The first cell labelled by both
+    searches lies on a shortest path.
+    """
+    if start == goal:
+        return [graph.position(start)], 1
+
+    open_cells, offsets = graph.open, graph.offsets
+    parent = (array('i', [-1]) * graph.cell_count, array('i', [-1]) * graph.cell_count)
+    parent[0][start] = start
+    parent[1][goal] = goal
+    frontiers = ([start], [goal])
+    expanded = 0
+
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own, other = parent[side], parent[1 - side]
+        next_frontier = []
+        for current in frontiers[side]:
+            expanded += 1
+            for offset in offsets:
+                nxt = current + offset
+                if open_cells[nxt] and own[nxt] < 0:
+                    own[nxt] = current
+                    if other[nxt] >= 0:
+                        forward = graph.path(parent[0], start, nxt)
+                        backward = graph.path(parent[1], goal, nxt)
+                        return forward + backward[-2::-1], expanded
+                    next_frontier.append(nxt)
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+
+    return [], expanded
+
+def _astar(graph: FlatGraph, start: int, goal: int) -> Tuple[List[List[int]], int]:
+    """A* search with the 4D Manhattan distance as heuristic."""
+    open_cells, offsets, strides = graph.open, graph.offsets, graph.strides
+    goal_coords = graph.position(goal)
+
+    def manhattan(index):
+        distance = 0
+        for stride, goal_coord in zip(strides, goal_coords):
+            c, index = divmod(index, stride)
+            distance += abs(c - 1 - goal_coord)
+        return distance
+
+    parent = array('i', [-1]) * graph.cell_count
+    cost = array('i', [-1]) * graph.cell_count
+    parent[start] = start
+    cost[start] = 0
+    heap = [(manhattan(start), 0, start)]  # (f, -g, index): ties go to the deeper node
+    expanded = 0
+
+    while heap:
+        _, neg_cost, current = heappop(heap)
+        current_cost = -neg_cost
+        if current_cost > cost[current]:
+            continue  # Stale entry
+        expanded += 1
+        if current == goal:
+            return graph.path(parent, start, goal), expanded
+        next_cost = current_cost + 1
+        for offset in offsets:
+            nxt = current + offset
+            if open_cells[nxt] and (cost[nxt] < 0 or next_cost < cost[nxt]):
+                cost[nxt] = next_cost
+                parent[nxt] = current
+                heappush(heap, (next_cost + manhattan(nxt), -next_cost, nxt))
+
+    return [], expanded
+
+ALGORITHMS = {
+    'bfs': _bfs,
+    'bidirectional': _bidirectional,
+    'astar': _astar,
+}
+
+def solve(start: List[int], goal: List[int], grid: LevelGrid,
+          algorithm: str = 'bfs') -> SolveResult:
+    """Find a shortest path from start to goal with the selected strategy."""
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected one of {', '.join(ALGORITHMS)}")
+
+    began = time.perf_counter()
+    graph = FlatGraph(grid)
+    if not (graph.is_open(start) and graph.is_open(goal)):
+        return SolveResult(False, [], 0, 0, time.perf_counter() - began, algorithm)
+
+    path, expanded = ALGORITHMS[algorithm](graph, graph.index(start), graph.index(goal))
+    elapsed = time.perf_counter() - began
+    if not path:
+        return SolveResult(False, [], 0, expanded, elapsed, algorithm)
+    return SolveResult(True, path, len(path) - 1, expanded, elapsed, algorithm)
+
+def bfs_solve(start: List[int], goal: List[int],
+              grid: LevelGrid) -> Tuple[bool, List[List[int]], int]:
     """
     Solve the 4D maze using BFS.
     Returns:
@@ -31,83 +204,712 @@ def bfs_solve(start: List[int], goal: List[int], size: int,
         - List[List[int]]: The path from start to goal
         - int: Number of steps in the solution
     """
-    queue = deque([(start, [start])])  # (current_pos, path_so_far)
-    visited = {tuple(start)}
-    
-    while queue:
-        current_pos, path = queue.popleft()
-        
-        if current_pos == goal:
-            return True, path, len(path) - 1  # -1 because we don't count starting position
-        
-        for next_pos in get_neighbors(current_pos, size, walls):
-            next_pos_tuple = tuple(next_pos)
-            if next_pos_tuple not in visited:
-                visited.add(next_pos_tuple)
-                queue.append((next_pos, path + [next_pos]))
-    
-    return False, [], 0
-
-def verify_level(level_data: Dict) -> Tuple[bool, int, List[List[int]]]:
-    """
-    Verify if a level is solvable and return solution details.
+    result = solve(start, goal, grid, 'bfs')
+    return result.solvable, result.path, result.steps
+
+def solve_level(level_data: Dict, algorithm: str = 'bfs') -> SolveResult:
+    """Solve a level dict with the selected strategy (chunked levels always use the tile BFS)."""
+    if isinstance(level_data.get('grid'), ChunkedGrid):
+        return tile_bfs_solve(level_data['start'], level_data['goal'], level_data['grid'])
+    grid = LevelGrid.from_level_data(level_data)
+    return solve(level_data['start'], level_data['goal'], grid, algorithm)
+
+def verify_level(level_data: Dict, algorithm: str = 'bfs',
+                 use_cache: bool = True) -> Tuple[bool, int, List[List[int]]]:
+    """
+    Verify if a level is solvable and return solution details, from the
+    solution cache when the level was solved before.
     Returns:
         - bool: Whether the level is solvable
         - int: Minimum number of steps needed
         - List[List[int]]: The solution path
     """
-    start = level_data['start']
-    goal = level_data['goal']
-    size = level_data['size']
-    walls = level_data['walls']
-    
-    solvable, path, steps = bfs_solve(start, goal, size, walls)
-    return solvable, steps, path
+    solution, _ = cached_solve(level_data, algorithm, use_cache, count_reachable=False)
+    return solution.solvable, solution.steps, solution.path
+
+class PlaneSolveResult(NamedTuple):
+    """Outcome of a search over (position, plane) states."""
+    solvable: bool
+    route: List[Tuple[List[int], str]]  # (position, plane) per state
+    steps: int
+    switches: int
+    cost: int
+    nodes_expanded: int
+    elapsed: float  # Seconds
+
+PLANE_NAMES = list(PLANES)
+
+def plane_solve(start: List[int], goal: List[int], grid: LevelGrid, step_cost: int = 1,
+                switch_cost: int = 1, start_plane: str = 'XY') -> PlaneSolveResult:
+    """
+    Cheapest route when, as in the game, the player moves within one of
+    the six PLANES at a time and switching plane costs `switch_cost`.
+
+    States are packed as cell * 6 + plane over FlatGraph indices, with
+    costs and parents in flat arrays. Costs of 0 and 1 use a 0-1 BFS on a
+    deque of state ints; other costs use Dijkstra with each heap entry
+    packed into a single int (cost * states + state). Steps must cost at
+    least 1 and switches at least 0.
+    """
+    if step_cost < 1 or switch_cost < 0:
+        raise ValueError(f"Invalid route costs: step {step_cost}, switch {switch_cost}")
+    began = time.perf_counter()
+    graph = FlatGraph(grid)
+    if not (graph.is_open(start) and graph.is_open(goal)):
+        return PlaneSolveResult(False, [], 0, 0, 0, 0, time.perf_counter() - began)
+
+    plane_count = len(PLANE_NAMES)
+    state_count = graph.cell_count * plane_count
+    open_cells = graph.open
+    # Moves within each plane, as offsets in the state space
+    plane_moves = [tuple(graph.offsets[2 * dim + side] * plane_count
+                         for dim in PLANES[name]['dims'] for side in (0, 1))
+                   for name in PLANE_NAMES]
+    plane_switches = [tuple(other - plane for other in range(plane_count) if other != plane)
+                      for plane in range(plane_count)]
+
+    cost = array('q', [-1]) * state_count
+    parent = array('i', [-1]) * state_count
+    done = bytearray(state_count)
+    start_state = graph.index(start) * plane_count + PLANE_NAMES.index(start_plane)
+    goal_cell = graph.index(goal)
+    cost[start_state] = 0
+    parent[start_state] = start_state
+    expanded = 0
+    found = -1
+
+    zero_one = step_cost in (0, 1) and switch_cost in (0, 1)
+    queue = deque([start_state]) if zero_one else [start_state]
+
+    while queue:
+        if zero_one:
+            state = queue.popleft()
+        else:
+            state = heappop(queue) % state_count
+        if done[state]:
+            continue
+        done[state] = 1
+        expanded += 1
+
+        cell, plane = divmod(state, plane_count)
+        if cell == goal_cell:
+            found = state
+            break
+
+        state_cost = cost[state]
+        for offsets, edge_cost in ((plane_moves[plane], step_cost), (plane_switches[plane], switch_cost)):
+            next_cost = state_cost + edge_cost
+            for offset in offsets:
+                nxt = state + offset
+                if open_cells[nxt // plane_count] and not done[nxt] and (cost[nxt] < 0 or next_cost < cost[nxt]):
+                    cost[nxt] = next_cost
+                    parent[nxt] = state
+                    if not zero_one:
+                        heappush(queue, next_cost * state_count + nxt)
+                    elif edge_cost == 0:
+                        queue.appendleft(nxt)
+                    else:
+                        queue.append(nxt)
+
+    elapsed = time.perf_counter() - began
+    if found < 0:
+        return PlaneSolveResult(False, [], 0, 0, 0, expanded, elapsed)
+
+    states = [found]
+    while states[-1] != start_state:
+        states.append(parent[states[-1]])
+    states.reverse()
+    steps = sum(a // plane_count != b // plane_count for a, b in zip(states, states[1:]))
+    route = [(graph.position(state // plane_count), PLANE_NAMES[state % plane_count]) for state in states]
+    return PlaneSolveResult(True, route, steps, len(states) - 1 - steps, cost[found], expanded, elapsed)
+
+def plane_routes(level_data: Dict, start_plane: str = 'XY') -> Dict[str, PlaneSolveResult]:
+    """
+    The fewest-switch route (ties broken by steps) and the fewest-step
+    route (ties broken by switches) for a level (dense levels only).
+    """
+    if isinstance(level_data.get('grid'), ChunkedGrid):
+        raise ValueError("Plane-aware routes need a dense level grid")
+    grid = LevelGrid.from_level_data(level_data)
+    start, goal = level_data['start'], level_data['goal']
+    weight = (grid.size + 2) ** 4  # More than any route's step or switch count
+    return {
+        'min_switches': plane_solve(start, goal, grid, 1, weight, start_plane),
+        'min_steps': plane_solve(start, goal, grid, weight, 1, start_plane),
+    }
+
+def print_route(name: str, result: PlaneSolveResult):
+    """Print a plane-aware route summary."""
+    print(f"[{name}] steps: {result.steps}, plane switches: {result.switches}, "
+          f"states expanded: {result.nodes_expanded}, time: {result.elapsed * 1000:.1f} ms")
+
+FIELD_WORD_BITS = 64
+
+def _pack_field_mask(mask: np.ndarray, padded_size: int, words: int) -> np.ndarray:
+    """
+    Pack a size^4 bool mask into a flat uint64 array, T axis bit-packed
+    (bit j of word k = T coordinate 64k + j) and X/Y/Z padded by one
+    empty cell on each side.
+    """
+    size = mask.shape[-1]
+    packed = np.zeros((padded_size,) * 3 + (words * 8,), dtype=np.uint8)
+    packed[1:-1, 1:-1, 1:-1, :(size + 7) // 8] = np.packbits(mask, axis=-1, bitorder='little')
+    return packed.view('<u8').ravel()
+
+def _unpack_field_mask(packed: np.ndarray, size: int, padded_size: int, words: int) -> np.ndarray:
+    """Inverse of _pack_field_mask."""
+    rows = packed.reshape((padded_size,) * 3 + (words,)).view(np.uint8)[1:-1, 1:-1, 1:-1]
+    return np.unpackbits(rows, axis=-1, count=size, bitorder='little').view(bool)
+
+def distance_field(grid: LevelGrid, source: List[int]) -> np.ndarray:
+    """
+    BFS distance from `source` to every cell, as an int16 array of shape
+    size^4 with -1 for walls and unreachable cells.
+
+    The frontier is expanded a whole layer at a time with array operations:
+    the grid is bit-packed along T and padded along X/Y/Z, so a step along
+    any axis is a shift of one flat word array (bits along T, whole words
+    along X/Y/Z) masked against the unvisited open cells. Layer numbers are
+    accumulated in bit planes and only unpacked once at the end.
+    """
+    size = grid.size
+    source = tuple(source)
+    dist = np.full(grid.shape, -1, dtype=np.int16)
+    if not grid.in_bounds(source) or grid.cells[source]:
+        return dist
+
+    words = size // FIELD_WORD_BITS + 1  # Keeps the top bit of every row spare
+    padded_size = size + 2
+    strides = (padded_size * padded_size * words, padded_size * words, words)
+
+    open_cells = _pack_field_mask(~grid.cells, padded_size, words)
+    seed = np.zeros(grid.shape, dtype=bool)
+    seed[source] = True
+    frontier = _pack_field_mask(seed, padded_size, words)
+    unvisited = open_cells & ~frontier
+    expanded = np.empty_like(frontier)
+    carry = np.empty_like(frontier)
+    one, top = np.uint64(1), np.uint64(FIELD_WORD_BITS - 1)
+
+    planes = []  # planes[b] holds the cells whose distance has bit b set
+    layer = 0
+    while True:
+        # Steps along T: bit shifts, carrying between words of one row.
+        # Bits that spill into a neighbouring row land on its spare top bit.
+        np.left_shift(frontier, one, out=expanded)
+        np.right_shift(frontier, one, out=carry)
+        expanded |= carry
+        if words > 1:
+            np.right_shift(frontier[:-1], top, out=carry[:-1])
+            expanded[1:] |= carry[:-1]
+            np.left_shift(frontier[1:], top, out=carry[1:])
+            expanded[:-1] |= carry[1:]
+        # Steps along X/Y/Z: whole-word shifts, wrapping only into padding
+        for stride in strides:
+            expanded[stride:] |= frontier[:-stride]
+            expanded[:-stride] |= frontier[stride:]
+
+        expanded &= unvisited
+        if not expanded.any():
+            break
+        layer += 1
+        unvisited ^= expanded
+        bit = 0
+        while layer >> bit:
+            if bit == len(planes):
+                planes.append(np.zeros_like(frontier))
+            if (layer >> bit) & 1:
+                planes[bit] |= expanded
+            bit += 1
+        frontier, expanded = expanded, frontier
+
+    dist[_unpack_field_mask(open_cells & ~unvisited, size, padded_size, words)] = 0
+    for bit, plane in enumerate(planes):
+        dist += _unpack_field_mask(plane, size, padded_size, words).astype(np.int16) << bit
+    return dist
+
+# Where each frontier face spills into the neighbouring tile, per column
+# of ChunkedGrid.tile_neighbors: (face of the frontier tiles, face of one
+# target tile). Faces along T are whole tiles, shifted by 7 bits.
+_TILE_SPILLS = (
+    ((slice(None), -1), (0,)),                                   # +X
+    ((slice(None), 0), (-1,)),                                   # -X
+    ((slice(None), slice(None), -1), (slice(None), 0)),          # +Y
+    ((slice(None), slice(None), 0), (slice(None), -1)),          # -Y
+    ((Ellipsis, -1), (Ellipsis, 0)),                             # +Z
+    ((Ellipsis, 0), (Ellipsis, -1)),                             # -Z
+    (None, ()),                                                  # +T
+    (None, ()),                                                  # -T
+)
+
+def _tile_wavefront(grid: ChunkedGrid, start: List[int], goal: Optional[List[int]] = None):
+    """
+    Level-synchronous BFS over a ChunkedGrid, one packed tile at a time.
+    Only tiles holding frontier cells are touched each layer: steps inside
+    a tile are shifts of its packed array, and each face that reaches the
+    tile edge is ORed into the neighbouring tile. Returns (layers, visited,
+    labels): the goal's distance (None if unreached, or the number of
+    layers when there is no goal), the visited bits, and two bit planes
+    holding every visited cell's distance mod 3, enough to walk a
+    shortest path back from the goal.
+    """
+    open_bits = grid.open_bits()
+    visited = np.zeros_like(open_bits)
+    incoming = np.zeros_like(open_bits)
+    labels = (np.zeros_like(open_bits), np.zeros_like(open_bits))
+    neighbors = grid.tile_neighbors()
+
+    tile, local, bit = grid.locate(start)
+    visited[(tile,) + local] = bit
+    active = np.array([tile])
+    frontier = np.zeros((1, TILE, TILE, TILE), dtype=np.uint8)
+    frontier[(0,) + local] = bit
+    goal_cell = None
+    if goal is not None:
+        goal_tile, goal_local, goal_bit = grid.locate(goal)
+        goal_cell = ((goal_tile,) + goal_local, goal_bit)
+
+    layer = 0
+    while len(active):
+        if goal_cell is not None and visited[goal_cell[0]] & goal_cell[1]:
+            return layer, visited, labels
+        layer += 1
+
+        # Steps inside each tile
+        step = frontier << 1
+        step |= frontier >> 1
+        step[:, 1:] |= frontier[:, :-1]
+        step[:, :-1] |= frontier[:, 1:]
+        step[:, :, 1:] |= frontier[:, :, :-1]
+        step[:, :, :-1] |= frontier[:, :, 1:]
+        step[..., 1:] |= frontier[..., :-1]
+        step[..., :-1] |= frontier[..., 1:]
+        incoming[active] |= step
+
+        # Steps across tile edges
+        touched = [active]
+        for column, (source, target) in enumerate(_TILE_SPILLS):
+            if source is None:
+                spill = frontier >> (TILE - 1) if column == 6 else frontier << (TILE - 1)
+            else:
+                spill = frontier[source]
+            tiles = neighbors[active, column]
+            keep = (tiles >= 0) & spill.reshape(len(active), -1).any(axis=1)
+            if keep.any():
+                tiles = tiles[keep]
+                incoming[(tiles,) + target] |= spill[keep]
+                touched.append(tiles)
+
+        touched = np.unique(np.concatenate(touched))
+        reached = incoming[touched] & open_bits[touched] & ~visited[touched]
+        incoming[touched] = 0
+        visited[touched] |= reached
+        for plane, label_bit in zip(labels, (1, 2)):
+            if layer % 3 & label_bit:
+                plane[touched] |= reached
+        nonempty = reached.reshape(len(touched), -1).any(axis=1)
+        active, frontier = touched[nonempty], reached[nonempty]
+
+    return (layer - 1 if goal is None else None), visited, labels
+
+def tile_bfs_solve(start: List[int], goal: List[int], grid: ChunkedGrid) -> SolveResult:
+    """Shortest path on a ChunkedGrid with the tile-walking BFS."""
+    began = time.perf_counter()
+    if not (grid.is_open(start) and grid.is_open(goal)):
+        return SolveResult(False, [], 0, 0, time.perf_counter() - began, 'tiles')
+
+    steps, visited, labels = _tile_wavefront(grid, start, goal)
+    expanded = int(POPCOUNT[visited].sum(dtype=np.int64))
+    if steps is None:
+        return SolveResult(False, [], 0, expanded, time.perf_counter() - began, 'tiles')
+
+    def label(pos):
+        tile, local, bit = grid.locate(pos)
+        index = (tile,) + local
+        if not visited[index] & bit:
+            return None
+        return (1 if labels[0][index] & bit else 0) | (2 if labels[1][index] & bit else 0)
+
+    # Walk back from the goal: a neighbour labelled (d - 1) mod 3 is one step closer
+    path = [list(goal)]
+    for distance in range(steps - 1, -1, -1):
+        pos = path[-1]
+        for dim, delta in DIRECTIONS:
+            previous = list(pos)
+            previous[dim] += delta
+            if grid.in_bounds(previous) and label(previous) == distance % 3:
+                path.append(previous)
+                break
+    path.reverse()
+    return SolveResult(True, path, steps, expanded, time.perf_counter() - began, 'tiles')
+
+def tile_reachable_count(grid: ChunkedGrid, source: List[int]) -> int:
+    """Number of cells reachable from `source` (including it) on a ChunkedGrid."""
+    if not grid.is_open(source):
+        return 0
+    _, visited, _ = _tile_wavefront(grid, source)
+    return int(POPCOUNT[visited].sum(dtype=np.int64))
+
+class TargetResult(NamedTuple):
+    """Answers for one target of a multi-target query."""
+    target: List[int]
+    distance: int  # Shortest path length, -1 if unreachable
+    path_count: int  # Number of distinct shortest paths
+    paths: List[List[List[int]]]  # Up to k shortest simple paths, shortest first
+
+def _padded_field(field: np.ndarray) -> np.ndarray:
+    """A distance field padded like a FlatGraph (-1 border), flattened."""
+    padded = np.full(tuple(s + 2 for s in field.shape), -1, dtype=np.int32)
+    padded[1:-1, 1:-1, 1:-1, 1:-1] = field
+    return padded.ravel()
+
+def shortest_path_counts(graph: FlatGraph, dist: np.ndarray, max_distance: int) -> np.ndarray:
+    """
+    Number of distinct shortest paths from the source of `dist` (a padded
+    flat distance field) to every cell up to `max_distance`, by dynamic
+    programming over the BFS layers: a cell's count is the sum of the
+    counts of its neighbours one layer closer. Counts are exact Python
+    ints (an object array), as they grow exponentially with distance.
+    """
+    counts = np.zeros(len(dist), dtype=object)
+    if max_distance < 0:
+        return counts  # Nothing to count: every target is unreachable
+    order = np.argsort(dist, kind='stable')
+    bounds = np.searchsorted(dist[order], np.arange(-1, max_distance + 2))
+    counts[order[bounds[1]:bounds[2]]] = 1  # Layer 0: the source
+    for layer in range(1, max_distance + 1):
+        cells = order[bounds[layer + 1]:bounds[layer + 2]]
+        total = np.zeros(len(cells), dtype=object)
+        for offset in graph.offsets:
+            neighbors = cells + offset
+            closer = dist[neighbors] == layer - 1
+            total[closer] += counts[neighbors[closer]]
+        counts[cells] = total
+    return counts
+
+def _descend(graph: FlatGraph, to_target: np.ndarray, source: int) -> List[int]:
+    """Shortest path from `source` following a distance-to-target field downhill."""
+    path = [source]
+    while to_target[path[-1]] > 0:
+        current = path[-1]
+        path.append(next(current + offset for offset in graph.offsets
+                         if to_target[current + offset] == to_target[current] - 1))
+    return path
+
+def _spur_search(graph: FlatGraph, to_target: np.ndarray, source: int, target: int,
+                 blocked_cells: Set[int], blocked_steps: Set[Tuple[int, int]]) -> Optional[List[int]]:
+    """
+    A* from source to target avoiding blocked cells and steps. The exact
+    distance-to-target field of the unblocked level is the heuristic, so
+    the search heads straight for the target unless a block forces a detour.
+    """
+    parent = {source: source}
+    cost = {source: 0}
+    heap = [(int(to_target[source]), 0, source)]
+    while heap:
+        _, neg_cost, current = heappop(heap)
+        if -neg_cost > cost[current]:
+            continue  # Stale entry
+        if current == target:
+            path = [current]
+            while path[-1] != source:
+                path.append(parent[path[-1]])
+            return path[::-1]
+        next_cost = -neg_cost + 1
+        for offset in graph.offsets:
+            nxt = current + offset
+            if (to_target[nxt] < 0 or nxt in blocked_cells or (current, nxt) in blocked_steps
+                    or next_cost >= cost.get(nxt, next_cost + 1)):
+                continue
+            cost[nxt] = next_cost
+            parent[nxt] = current
+            heappush(heap, (next_cost + int(to_target[nxt]), -next_cost, nxt))
+    return None
+
+def k_shortest_paths(graph: FlatGraph, to_target: np.ndarray, source: int, target: int,
+                     k: int) -> List[List[int]]:
+    """
+    Yen's algorithm: the k shortest simple paths from source to target, as
+    flat index lists. Every spur search reuses the target's distance
+    field as its heuristic.
+    """
+    if to_target[source] < 0:
+        return []
+    found = [_descend(graph, to_target, source)]
+    candidates = []
+    seen = {tuple(found[0])}
+    while len(found) < k:
+        previous = found[-1]
+        for i in range(len(previous) - 1):
+            root = previous[:i + 1]
+            blocked_steps = {(path[i], path[i + 1]) for path in found
+                             if len(path) > i + 1 and path[:i + 1] == root}
+            spur = _spur_search(graph, to_target, previous[i], target, set(root[:-1]), blocked_steps)
+            if spur is not None:
+                path = root[:-1] + spur
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    heappush(candidates, (len(path), path))
+        if not candidates:
+            break
+        found.append(heappop(candidates)[1])
+    return found
+
+def multi_target_solve(start: List[int], targets: List[List[int]], grid: LevelGrid,
+                       k: int = 1) -> List[TargetResult]:
+    """
+    Answer shortest-path queries from `start` to many targets with one
+    search: a single distance field gives every target's distance, and
+    path counts come from one DP pass over its layers, and a shortest path
+    is that field walked back from the target. Only with k > 1 does each
+    reachable target get its own distance field, the heuristic of the
+    Yen searches for its k shortest simple paths.
+    """
+    graph = FlatGraph(grid)
+    from_start = _padded_field(distance_field(grid, start))
+    target_cells = [graph.index(target) if grid.in_bounds(target) else None for target in targets]
+    distances = [int(from_start[cell]) if cell is not None else -1 for cell in target_cells]
+    counts = shortest_path_counts(graph, from_start, max(distances, default=-1))
+
+    results = []
+    for target, cell, distance in zip(targets, target_cells, distances):
+        if distance < 0:
+            results.append(TargetResult(list(target), -1, 0, []))
+            continue
+        if k > 1:
+            to_target = _padded_field(distance_field(grid, target))
+            paths = k_shortest_paths(graph, to_target, graph.index(start), cell, k)
+        else:
+            paths = [_descend(graph, from_start, cell)[::-1]]
+        results.append(TargetResult(list(target), distance, int(counts[cell]),
+                                    [[graph.position(i) for i in path] for path in paths]))
+    return results
+
+def solve_targets(level_data: Dict, targets: List[List[int]], k: int = 1) -> List[TargetResult]:
+    """multi_target_solve from the level's start (dense levels only)."""
+    if isinstance(level_data.get('grid'), ChunkedGrid):
+        raise ValueError("Multi-target queries need a dense level grid")
+    return multi_target_solve(level_data['start'], targets, LevelGrid.from_level_data(level_data), k)
+
+def reachable_count(level_data: Dict) -> int:
+    """Open cells reachable from the level's start."""
+    if isinstance(level_data.get('grid'), ChunkedGrid):
+        return tile_reachable_count(level_data['grid'], level_data['start'])
+    grid = LevelGrid.from_level_data(level_data)
+    return int(np.count_nonzero(distance_field(grid, level_data['start']) >= 0))
+
+def store_solution(level_data: Dict, result: SolveResult):
+    """Record a fresh solve in the solution cache."""
+    if not solutions.enabled:
+        return
+    solutions.put(level_key(level_data), CachedSolution(result.solvable, result.steps, result.path,
+                                                        reachable_count(level_data)))
+
+def cached_solve(level_data: Dict, algorithm: str = 'bfs', use_cache: bool = True,
+                 count_reachable: bool = True) -> Tuple[CachedSolution, Optional[SolveResult]]:
+    """
+    The level's solution from the solution cache, or solved with
+    `algorithm` and stored there. Also returns the SolveResult when a
+    search ran (None on a cache hit). The reachable cell count of a fresh
+    solve is only computed when it is stored or `count_reachable` asks
+    for it (-1 otherwise).
+    """
+    store = use_cache and solutions.enabled
+    if store:
+        key = level_key(level_data)
+        cached = solutions.get(key, level_data['start'])
+        if cached is not None:
+            return cached, None
+    result = solve_level(level_data, algorithm)
+    reachable = reachable_count(level_data) if store or count_reachable else -1
+    solution = CachedSolution(result.solvable, result.steps, result.path, reachable)
+    if store:
+        solutions.put(key, solution)
+    return solution, result
+
+def level_distance_field(level_data: Dict) -> np.ndarray:
+    """Distance from the goal to every cell of a level (see distance_field)."""
+    return distance_field(LevelGrid.from_level_data(level_data), level_data['goal'])
+
+def print_stats(result: SolveResult):
+    """Print search effort for a solve."""
+    print(f"[{result.algorithm}] nodes expanded: {result.nodes_expanded}, "
+          f"time: {result.elapsed * 1000:.1f} ms")
+
+REPORT_FIELDS = ['level', 'file', 'algorithm', 'solvable', 'min_steps', 'reachable_cells',
+                 'nodes_expanded', 'load_time', 'solve_time', 'cached']
+
+def solve_level_file(level_file: Path, algorithm: str = 'bfs', use_cache: bool = True) -> Dict:
+    """Load and solve one level file (or look it up in the solution cache), returning a report row."""
+    began = time.perf_counter()
+    level_data = load_level(level_file)
+    load_time = time.perf_counter() - began
+
+    began = time.perf_counter()
+    solution, result = cached_solve(level_data, algorithm, use_cache)
+    return {
+        'level': Path(level_file).stem,
+        'file': str(level_file),
+        'algorithm': result.algorithm if result else 'cache',
+        'solvable': solution.solvable,
+        'min_steps': solution.steps if solution.solvable else None,
+        'reachable_cells': solution.reachable,
+        'nodes_expanded': result.nodes_expanded if result else 0,
+        'load_time': load_time,
+        'solve_time': result.elapsed if result else time.perf_counter() - began,
+        'cached': result is None
+    }
+
+def batch_solve(level_files: List[Path], algorithms: List[str],
+                workers: Optional[int] = None, use_cache: bool = True) -> Iterator[Dict]:
+    """
+    Solve many level files across a process pool, yielding report rows
+    as they finish. workers=1 solves in this process.
+    """
+    jobs = [(level_file, algorithm) for level_file in level_files for algorithm in algorithms]
+    if workers == 1:
+        for level_file, algorithm in jobs:
+            yield solve_level_file(level_file, algorithm, use_cache)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(solve_level_file, level_file, algorithm, use_cache)
+                   for level_file, algorithm in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+def write_report(rows: List[Dict], report_file: Path):
+    """Write batch results as JSON or CSV, chosen by extension."""
+    rows = sorted(rows, key=lambda row: (natural_sort_key(Path(row['file'])), row['algorithm']))
+    if Path(report_file).suffix == '.csv':
+        with open(report_file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(report_file, 'w') as f:
+            json.dump({"levels": rows}, f, indent=4)
+
+def print_targets(results: List[TargetResult]):
+    for result in results:
+        if result.distance < 0:
+            print(f"  {result.target}: not reachable")
+            continue
+        lengths = ", ".join(str(len(path) - 1) for path in result.paths)
+        print(f"  {result.target}: {result.distance} steps, {result.path_count} shortest paths, "
+              f"{len(result.paths)} shortest simple paths of length {lengths}")
 
 def main():
     """Test specific level or all levels based on command line argument."""
     parser = argparse.ArgumentParser(description='Solve 4D maze levels')
     parser.add_argument('--level', type=int, help='Level number to solve (optional)')
+    parser.add_argument('--algorithm', choices=[*ALGORITHMS, 'all'], default='bfs',
+                        help='Search strategy, or "all" to compare them (default: bfs)')
+    parser.add_argument('--glob', help='Glob of level files to batch solve (default: every level in levels/)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes for batch solving (default: CPU count)')
+    parser.add_argument('--report', type=Path, help='Write batch results to a .json or .csv file')
+    parser.add_argument('--planes', action='store_true',
+                        help='With --level, also find the fewest-switch and fewest-step in-game routes')
+    parser.add_argument('--step-cost', type=int,
+                        help='With --planes, also find the cheapest route for this cost per step...')
+    parser.add_argument('--switch-cost', type=int, default=1,
+                        help='...and this cost per plane switch (default: 1)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always search, ignoring and not updating the solution cache')
+    parser.add_argument('--targets', nargs='+', metavar='X,Y,Z,T',
+                        help='With --level, distances and shortest path counts to these cells (default: the goal)')
+    parser.add_argument('--k', type=int, default=1,
+                        help='With --targets, list the k shortest simple paths to each target (default: 1)')
     args = parser.parse_args()
+    query_targets = bool(args.targets) or args.k != 1
+    if query_targets and args.level is None:
+        parser.error("--targets and --k need --level")
+    if args.k < 1:
+        parser.error("--k must be at least 1")
+    if args.step_cost is not None and args.step_cost < 1:
+        parser.error("--step-cost must be at least 1")
+    if args.switch_cost < 0:
+        parser.error("--switch-cost must not be negative")
+    try:
+        targets = [[int(c) for c in target.split(',')] for target in args.targets or []]
+    except ValueError:
+        parser.error("targets are written x,y,z,t")
+    if any(len(target) != 4 for target in targets):
+        parser.error("targets are written x,y,z,t")
 
     levels_path = Path("levels")
-    
+    algorithms = list(ALGORITHMS) if args.algorithm == 'all' else [args.algorithm]
+
     if args.level is not None:
         # Test specific level
-        level_file = levels_path / f"{args.level}.json"
+        level_file = find_level_file(levels_path, args.level)
         if not level_file.exists():
             print(f"Error: Level {args.level} does not exist!")
             sys.exit(1)
-            
+
         print(f"\nTesting {level_file.name}...")
-        with open(level_file, 'r') as f:
-            level_data = json.load(f)
-        
-        solvable, min_steps, solution_path = verify_level(level_data)
-        
-        if solvable:
+        level_data = load_level(level_file)
+        if args.planes and isinstance(level_data['grid'], ChunkedGrid):
+            parser.error(f"--planes needs a dense level grid, {level_file.name} is chunked")
+
+        results = [solve_level(level_data, algorithm) for algorithm in algorithms]
+        result = results[0]
+
+        if result.solvable:
             print(f"✓ Level {args.level} is solvable!")
-            print(f"Minimum steps required: {min_steps}")
-            print(f"Solution path:")
-            for i, pos in enumerate(solution_path):
+            print(f"Minimum steps required: {result.steps}")
+            for other in results:
+                print_stats(other)
+            if args.planes:
+                for name, route in plane_routes(level_data).items():
+                    print_route(name, route)
+                if args.step_cost is not None:
+                    route = plane_solve(level_data['start'], level_data['goal'],
+                                        LevelGrid.from_level_data(level_data), args.step_cost, args.switch_cost)
+                    print_route(f"cost {args.step_cost}/{args.switch_cost}", route)
+            if query_targets:
+                print_targets(solve_targets(level_data, targets or [level_data['goal']], args.k))
+            print("Solution path:")
+            for i, pos in enumerate(result.path):
                 print(f"Step {i}: {pos}")
         else:
             print(f"✗ Level {args.level} is NOT solvable!")
+            for other in results:
+                print_stats(other)
+            if query_targets:
+                print_targets(solve_targets(level_data, targets or [level_data['goal']], args.k))
     else:
         # Test all levels
-        for level_file in sorted(levels_path.glob("level_*.json")):
-            print(f"\nTesting {level_file.name}...")
-            
-            with open(level_file, 'r') as f:
-                level_data = json.load(f)
-            
-            solvable, min_steps, solution_path = verify_level(level_data)
-            
-            if solvable:
-                print(f"✓ Level is solvable!")
-                print(f"Minimum steps required: {min_steps}")
+        if args.glob:
+            level_files = sorted(Path().glob(args.glob), key=natural_sort_key)
+        else:
+            level_files = sorted(list_level_files(levels_path), key=natural_sort_key)
+        if not level_files:
+            print("Error: No levels found!")
+            sys.exit(1)
+
+        print(f"Solving {len(level_files)} levels with {args.workers} workers...")
+        began = time.perf_counter()
+        rows = []
+        for row in batch_solve(level_files, algorithms, args.workers, not args.no_cache):
+            rows.append(row)
+            if row['solvable']:
+                solve_time = "cached" if row['cached'] else f"solve {row['solve_time'] * 1000:.1f} ms"
+                print(f"✓ {row['file']} [{row['algorithm']}]: {row['min_steps']} steps, "
+                      f"{row['reachable_cells']} reachable cells, "
+                      f"load {row['load_time'] * 1000:.1f} ms, {solve_time}")
             else:
-                print(f"✗ Level is NOT solvable!")
+                print(f"✗ {row['file']} [{row['algorithm']}]: NOT solvable, "
+                      f"{row['reachable_cells']} reachable cells")
+
+        solved = sum(row['solvable'] for row in rows)
+        cached = sum(row['cached'] for row in rows)
+        print(f"\n{solved}/{len(rows)} solvable in {time.perf_counter() - began:.2f} s "
+              f"({cached} from the solution cache)")
+        if args.report:
+            write_report(rows, args.report)
+            print(f"Report saved to {args.report}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()